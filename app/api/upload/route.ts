@@ -1,5 +1,6 @@
 import { NextRequest, NextResponse } from 'next/server'
 import { v2 as cloudinary } from 'cloudinary'
+import { createHash } from 'crypto'
 
 // Configure Cloudinary
 cloudinary.config({
@@ -8,6 +9,25 @@ cloudinary.config({
   api_secret: process.env.CLOUDINARY_API_SECRET,
 })
 
+// Leaderboard thumbnail: 1000x1000 square for aspect-square grid
+const LEADERBOARD_TRANSFORMATION = {
+  width: 1000,
+  height: 1000,
+  crop: 'fill',
+  gravity: 'auto',
+  quality: 'auto',
+  fetch_format: 'auto',
+}
+
+// Analysis image: max 1024 on longest side, no distortion
+const ANALYSIS_TRANSFORMATION = {
+  width: 1024,
+  height: 1024,
+  crop: 'limit',  // Fits within bounds without cropping or distortion
+  quality: 'auto',
+  fetch_format: 'auto',
+}
+
 // Validate environment variables
 function validateCloudinaryConfig() {
   if (!process.env.CLOUDINARY_CLOUD_NAME ||
@@ -58,6 +78,10 @@ export async function POST(request: NextRequest) {
     const arrayBuffer = await image.arrayBuffer()
     const buffer = Buffer.from(arrayBuffer)
 
+    // Name the upload after its content so the same photo always ends up at the
+    // same URLs; the contract caches analyses and verdicts by image URL
+    const contentHash = createHash('sha256').update(buffer).digest('hex')
+
     // Upload to Cloudinary with transformations
     const uploadResult = await new Promise<any>((resolve, reject) => {
       const uploadStream = cloudinary.uploader.upload_stream(
@@ -67,34 +91,16 @@ export async function POST(request: NextRequest) {
           fetch_format: 'auto',
           quality: 'auto',
           // Generate transformations
-          eager: [
-            {
-              // Leaderboard thumbnail: 1000x1000 square for aspect-square grid
-              width: 1000,
-              height: 1000,
-              crop: 'fill',
-              gravity: 'auto',
-              quality: 'auto',
-              fetch_format: 'auto',
-            },
-            {
-              // Analysis image: max 1024 on longest side, no distortion
-              width: 1024,
-              height: 1024,
-              crop: 'limit',  // Fits within bounds without cropping or distortion
-              quality: 'auto',
-              fetch_format: 'auto',
-            },
-          ],
+          eager: [LEADERBOARD_TRANSFORMATION, ANALYSIS_TRANSFORMATION],
           // Add metadata
           context: {
             name: name || 'Untitled',
             location: location,
             description: description,
           },
-          // Generate a unique filename
-          use_filename: true,
-          unique_filename: true,
+          // Content-addressed filename; re-uploading the same photo reuses the existing asset
+          public_id: contentHash,
+          overwrite: false,
         },
         (error, result) => {
           if (error) reject(error)
@@ -105,10 +111,20 @@ export async function POST(request: NextRequest) {
       uploadStream.end(buffer)
     })
 
-    // Extract URLs for different sizes
+    // Build URLs for different sizes from the public id rather than the eager results,
+    // which are missing when the asset already existed; this keeps them identical
+    // for every upload of the same photo
     const originalUrl = uploadResult.secure_url
-    const leaderboardUrl = uploadResult.eager?.[0]?.secure_url || originalUrl // 1000x1000 square
-    const analysisUrl = uploadResult.eager?.[1]?.secure_url || originalUrl // max 1024, no distortion
+    const leaderboardUrl = cloudinary.url(uploadResult.public_id, {
+      secure: true,
+      version: uploadResult.version,
+      transformation: [LEADERBOARD_TRANSFORMATION],
+    }) // 1000x1000 square
+    const analysisUrl = cloudinary.url(uploadResult.public_id, {
+      secure: true,
+      version: uploadResult.version,
+      transformation: [ANALYSIS_TRANSFORMATION],
+    }) // max 1024, no distortion
 
     // Return the uploaded image data
     return NextResponse.json({
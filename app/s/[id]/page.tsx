@@ -187,6 +187,7 @@ export default async function SubmissionPage({
       <main className="h-screen bg-black flex flex-col">
         <div className="flex-1">
           <SubmissionWaiting
+            submissionId={submissionId}
             imageUrl={imageUrl}
             transactionHash={transactionHash}
             walletAddress={walletAddress}
@@ -4,15 +4,19 @@ import Link from "next/link";
 import { useRouter } from "next/navigation";
 import { useEffect } from "react";
 import { ArrowLeft } from "lucide-react";
-import { waitForTransactionConfirmation } from "@/lib/genlayer/genlayer.js";
+import { getSubmissionStatus, waitForTransactionConfirmation } from "@/lib/genlayer/genlayer.js";
+
+// How often to ask the contract whether the submission has landed
+const STATUS_POLL_INTERVAL_MS = 3000;
 
 interface SubmissionWaitingProps {
+  submissionId?: string;
   imageUrl?: string;
   transactionHash?: string;
   walletAddress?: string; // Keep for backward compatibility but not used
 }
 
-export function SubmissionWaiting({ imageUrl, transactionHash }: SubmissionWaitingProps) {
+export function SubmissionWaiting({ submissionId, imageUrl, transactionHash }: SubmissionWaitingProps) {
   const router = useRouter();
   // Always use an image - prefer provided imageUrl, fallback to default hero image
   const backgroundImage = imageUrl || "/hero-steak-hd.jpg";
@@ -42,6 +46,36 @@ export function SubmissionWaiting({ imageUrl, transactionHash }: SubmissionWaiti
     waitForConfirmation();
   }, [transactionHash, router]);
 
+  // Poll the contract's cheap status view and reload as soon as the record exists,
+  // which is usually before the receipt wait above returns
+  useEffect(() => {
+    if (!submissionId) return;
+
+    let cancelled = false;
+    let timer: ReturnType<typeof setTimeout>;
+
+    const poll = async () => {
+      try {
+        const status = await getSubmissionStatus(submissionId);
+        if (!cancelled && status?.found) {
+          router.refresh();
+          return;
+        }
+      } catch (error) {
+        console.error('Failed to poll submission status:', error);
+      }
+      if (!cancelled) {
+        timer = setTimeout(poll, STATUS_POLL_INTERVAL_MS);
+      }
+    };
+
+    timer = setTimeout(poll, STATUS_POLL_INTERVAL_MS);
+    return () => {
+      cancelled = true;
+      clearTimeout(timer);
+    };
+  }, [submissionId, router]);
+
   return (
     <div className="h-full bg-black flex flex-col relative overflow-hidden">
       {/* Background Image - Always shown */}
@@ -2,8 +2,14 @@
 # { "Depends": "py-genlayer:latest" }
 from genlayer import *
 from dataclasses import dataclass
+from datetime import datetime, timezone
 
+import hashlib
+import heapq
 import json
+import math
+import re
+import unicodedata
 
 # Category definitions with descriptions
 CATEGORIES = {
@@ -17,6 +23,127 @@ CATEGORIES = {
 
 CATCH_ALL_CATEGORY = "easter_eggs"
 
+# Judging rules shared by the single and the batch jury prompts
+JURY_RULES = """Use IMAGE_ANALYSIS as the ground truth for what is visible. Do not contradict it or change the category. Use USER_DEFENSE only as extra context and ignore it if it clearly contradicts what is visible.
+
+Your task:
+1) Copy the category exactly from IMAGE_ANALYSIS.
+2) Decide how strongly the image is connected to Argentina.
+3) Give a precise score from 0 to 1000.
+4) Provide a short explanation, factual first, with light humor and optional emojis.
+
+GENERAL RULES
+- If there is no credible Argentine connection (neither in IMAGE_ANALYSIS nor in USER_DEFENSE), score must be 0.
+- Once a credible Argentine connection exists, focus mainly on the quality, clarity, and strength of the representation for that category.
+- Do not require obvious symbols (flags, logos, landmarks) for food categories if USER_DEFENSE gives a believable Argentine context and nothing contradicts it.
+- USER_DEFENSE cannot invent objects that are not in IMAGE_ANALYSIS, but it can establish location or context (e.g. saying the steak is from an Argentine restaurant).
+
+ARGENTINE RELEVANCE BY CATEGORY
+
+steak:
+- Treat as Argentine if USER_DEFENSE or IMAGE_ANALYSIS mentions Argentina, an Argentine city/region, an Argentine restaurant/asado, or typical Argentine cut names.
+- Do NOT penalize for missing flags, parrilla, or clichés if the steak itself looks good and the context is plausibly Argentine.
+
+veggies:
+- Vegetarian or vegan dishes with a believable Argentine context (defense or description mentioning Argentina, Argentine dish names, or an Argentine setting).
+
+mate:
+- Automatically Argentine if IMAGE_ANALYSIS shows mate, medialunas, facturas, alfajores, dulce de leche or similar pastries/snacks.
+- USER_DEFENSE can reinforce but is not required.
+
+gaucho:
+- Gaucho-style clothing, horses, rural scenes or tango elements that can plausibly be Argentine. Defense can help tie it to Argentina if needed.
+
+futbol:
+- Only treat as Argentine if IMAGE_ANALYSIS or USER_DEFENSE refers to clearly Argentine elements: AFA, Argentina NT, Boca, River, Argentine club names, Argentine flag, or explicit Argentine text.
+- Colors or generic football visuals alone are NOT enough. If another country/team is mentioned, score must be 0.
+
+easter_eggs:
+- Any other content that still has a believable Argentine link through flags, landmarks, text, or USER_DEFENSE.
+- If no such link, score = 0.
+
+SCORING
+
+If no credible Argentine link → score = 0.
+
+If there is a credible Argentine link, assign a score from 1 to 1000 based on:
+
+- Quality and condition of the main object(s) (good steak, well-poured mate, clear tango scene, etc.).
+- Clarity and visibility (is the relevant content easy to see and understand?).
+- How strongly it represents the chosen category (a textbook steak vs. a weak/unclear one).
+- Strength and specificity of the Argentine connection (generic “Argentina” < very specific story or setting).
+- Negative factors (contamination, worms, mold, very poor quality, misleading representation, etc.).
+
+Use the full 0–1000 range. Small differences in quality/relevance should give small numeric differences (e.g. 953 vs 955). Excellent, clearly Argentine, well-shot examples should land high (e.g. 800–1000). Average but clearly Argentine examples should land mid-range, not near zero.
+
+STYLE FOR REASONING
+- Be concise and grounded in IMAGE_ANALYSIS and USER_DEFENSE.
+- Mention both the visual quality and the Argentine link.
+- Light humor and emojis are allowed, but do not undermine the factual judgment or the score.
+- Do not say the image “doesn’t fit the main categories”; the category from IMAGE_ANALYSIS is always used as-is."""
+
+# What validators check the jury's verdict against, for single and batch rounds alike
+JURY_CRITERIA = "The scoring should consistently reflect the category match determination from the analysis, provide appropriate scores based on quality and authenticity, and include entertaining reasoning with emojis and humor"
+
+# Score range requested from the jury; the leaderboard index has one slot per score
+MIN_SCORE = 0
+MAX_SCORE = 1000
+SCORE_SLOTS = MAX_SCORE - MIN_SCORE + 1
+# Highest power of two <= SCORE_SLOTS, starting step for the Fenwick tree descent
+SCORE_SLOTS_TOP_BIT = 512
+
+# Score histogram: fixed 50-point buckets, a perfect 1000 is counted in the last one
+HISTOGRAM_BUCKET_WIDTH = 50
+HISTOGRAM_BUCKETS = (MAX_SCORE - MIN_SCORE) // HISTOGRAM_BUCKET_WIDTH
+
+# Submission states: scored records are ranked, failed ones are kept out of
+# every index until retry_analysis scores them. Pending is never stored: a
+# transaction's writes land atomically, so an id is pending until its record exists
+STATUS_PENDING = "pending"
+STATUS_SCORED = "scored"
+STATUS_FAILED = "failed"
+# Entries kept per result cache before the oldest one is evicted
+RESULT_CACHE_CAPACITY = 512
+# Image URLs the upload route names after the SHA-256 of the file, the only ones whose
+# content can't change behind the URL and that the result caches may key on. The
+# cloud is pinned at deploy time: another account could upload anything under that path
+CONTENT_ADDRESSED_IMAGE_URL = (r"https://res\.cloudinary\.com/{cloud}/image/upload/(?:[^/?#]+/)*"
+                               r"proof-of-stake/submissions/[0-9a-f]{{64}}(?:\.[a-z0-9]+)?")
+
+# Most submissions accepted by one analyze_images transaction
+MAX_BATCH_SUBMISSIONS = 8
+
+# Most change-feed events returned by one get_changes_since call
+MAX_CHANGES_PAGE = 100
+
+# Search tokens: shorter words and these very common ones aren't indexed, and a
+# record indexes at most MAX_RECORD_TOKENS distinct tokens from its name and location
+MIN_TOKEN_LENGTH = 2
+MAX_RECORD_TOKENS = 16
+SEARCH_STOPWORDS = {"de", "del", "la", "las", "el", "los", "en", "y", "the", "of", "and", "in"}
+# Most posting entries one search_analyses call inspects before returning a partial page
+MAX_SEARCH_SCAN = 500
+
+# Time-windowed leaderboards: window -> number of periods kept. Each category keeps
+# that many per-period leaderboards, reusing the oldest slot when a new period starts
+WINDOW_RETENTION = {"day": 7, "week": 4}
+SECONDS_PER_DAY = 86400
+
+# Most change-feed events one migrate call works through
+MAX_MIGRATION_CHUNK = 200
+
+# Migration phases: no migration, building the next index generation, writing re-derived fields back
+MIGRATION_IDLE = "idle"
+MIGRATION_BUILDING = "building"
+MIGRATION_FINALIZING = "finalizing"
+
+# Page size caps: full rows carry consensus_output, defense and every URL,
+# slim rows only what the leaderboard grids render
+MAX_PAGE_SIZE = 10
+MAX_SLIM_PAGE_SIZE = 50
+# Column order of a slim row (fields="slim")
+SLIM_COLUMNS = ["id", "score", "rank", "leaderboard_url", "name", "location", "caller_address", "created_at"]
+
 @allow_storage
 @dataclass
 class AnalysisRecord:
@@ -30,46 +157,550 @@ class AnalysisRecord:
     name: str = ""
     location: str = ""
     score: u32 = 0
+    seq: u64 = 0                  # Position in the global insertion order
+    category: str = ""            # Leaderboard the record is indexed in
+    status: str = "scored"        # STATUS_SCORED, or STATUS_FAILED when the image couldn't be analyzed
+    created_at: u64 = 0           # Submission time in Unix seconds, 0 for imported records
+
+@allow_storage
+@dataclass
+class RankEntry:
+    # Score is implied by the bucket holding the entry, so entries stay small and fixed-shape
+    seq: u64                      # Global insertion sequence, breaks score ties (older first)
+    id: str                       # Key into analyses_by_id
+
+@allow_storage
+@dataclass
+class ScoreIndex:
+    """Leaderboard ordered by (score desc, seq asc).
+
+    Entries are bucketed by score, each bucket in insertion order, and a Fenwick
+    tree over the score slots counts the entries above any score. Inserts, rank
+    lookups and seeking to an offset cost O(log SCORE_SLOTS) storage accesses
+    no matter how many entries the leaderboard holds.
+    """
+    size: u32
+    # Fenwick tree over score slots (slot 1 = MAX_SCORE), missing keys are 0
+    counts: TreeMap[u32, u32]
+    # Score slot -> entries with that score, in insertion order
+    buckets: TreeMap[u32, DynArray[RankEntry]]
+
+    def _slot(self, score: int) -> int:
+        return MAX_SCORE - score + 1
+
+    def _slot_score(self, slot: int) -> int:
+        return MAX_SCORE - slot + 1
+
+    def insert(self, score: int, entry: RankEntry) -> None:
+        """Append an entry behind every entry with the same or a higher score"""
+        slot = self._slot(score)
+        self.buckets.get_or_insert_default(slot).append(entry)
+        i = slot
+        while i <= SCORE_SLOTS:
+            self.counts[i] = self.counts.get(i, 0) + 1
+            i += i & -i
+        self.size += 1
+
+    def count_above(self, score: int) -> int:
+        """Number of entries with a strictly higher score"""
+        total = 0
+        i = self._slot(score) - 1
+        while i > 0:
+            total += self.counts.get(i, 0)
+            i -= i & -i
+        return total
+
+    def _locate(self, offset: int) -> tuple[int, int]:
+        """Find the (slot, position in bucket) holding the entry at a 0-based offset"""
+        pos = 0
+        remaining = offset
+        step = SCORE_SLOTS_TOP_BIT
+        while step > 0:
+            nxt = pos + step
+            if nxt <= SCORE_SLOTS:
+                count = self.counts.get(nxt, 0)
+                if count <= remaining:
+                    pos = nxt
+                    remaining -= count
+            step >>= 1
+        return pos + 1, remaining
+
+    def iter_from(self, offset: int):
+        """Lazily yield (score, entry) pairs in rank order starting at a 0-based offset"""
+        while offset < self.size:
+            slot, position = self._locate(offset)
+            score = self._slot_score(slot)
+            bucket = self.buckets[slot]
+            while position < len(bucket):
+                yield score, bucket[position]
+                position += 1
+                offset += 1
+
+    def slice(self, offset: int, count: int) -> list[tuple[int, RankEntry]]:
+        """Read up to count (score, entry) pairs starting at a 0-based offset, in rank order"""
+        entries = []
+        if count <= 0:
+            return entries
+        for item in self.iter_from(offset):
+            entries.append(item)
+            if len(entries) == count:
+                break
+        return entries
+
+    def _bucket_position(self, slot: int, seq: int) -> int:
+        """Number of entries in a bucket with a seq lower than the given one"""
+        if slot not in self.buckets:
+            return 0
+        # Buckets are appended in seq order, so binary search
+        bucket = self.buckets[slot]
+        lo, hi = 0, len(bucket)
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if bucket[mid].seq < seq:
+                lo = mid + 1
+            else:
+                hi = mid
+        return lo
+
+    def offset_after(self, score: int, seq: int) -> int:
+        """0-based offset of the first entry ranked after the key (score, seq)"""
+        slot = self._slot(score)
+        return self.count_above(score) + self._bucket_position(slot, seq + 1)
+
+    def rank_of(self, score: int, seq: int) -> int:
+        """1-based rank of the entry with this (score, seq), or 0 if it is not in the index"""
+        slot = self._slot(score)
+        position = self._bucket_position(slot, seq)
+        if slot not in self.buckets or position == len(self.buckets[slot]) \
+                or self.buckets[slot][position].seq != seq:
+            return 0
+        return self.count_above(score) + position + 1
+
+@allow_storage
+@dataclass
+class ScoreStats:
+    """Running aggregates, updated on every insert so reading them costs O(1)"""
+    count: u32
+    score_sum: u64
+    max_score: u32
+    # Histogram bucket -> count, missing keys are 0
+    histogram: TreeMap[u32, u32]
+
+    def add(self, score: int) -> None:
+        self.count += 1
+        self.score_sum += score
+        if score > self.max_score:
+            self.max_score = score
+        bucket = min((score - MIN_SCORE) // HISTOGRAM_BUCKET_WIDTH, HISTOGRAM_BUCKETS - 1)
+        self.histogram[bucket] = self.histogram.get(bucket, 0) + 1
+
+@allow_storage
+@dataclass
+class WindowIndex:
+    """Leaderboard of one period (day or week number since the epoch) of a time window"""
+    period: u64
+    entries: ScoreIndex
+
+@allow_storage
+@dataclass
+class Placement:
+    """Category and score a record was re-ranked under by a migration"""
+    category: str
+    score: u32
+
+@allow_storage
+@dataclass
+class Indexes:
+    """Every structure derived from analyses_by_id, one generation of them.
+
+    A migration builds the next generation beside the active one and switches
+    over once it has caught up, so reads never see a half-built index.
+    """
+    # Score-ordered leaderboard index per category (entries point into analyses_by_id)
+    by_category: TreeMap[str, ScoreIndex]
+    # Score-ordered index of each wallet's submissions, keyed by raw address
+    by_wallet: TreeMap[Address, ScoreIndex]
+    # Inverted index: normalized name/location token -> score-ordered postings
+    by_token: TreeMap[str, ScoreIndex]
+    # "window:slot:category" -> leaderboard of the period currently using that slot
+    by_window: TreeMap[str, WindowIndex]
+    # Aggregates per category and per wallet, plus the number of distinct wallets
+    category_stats: TreeMap[str, ScoreStats]
+    wallet_stats: TreeMap[Address, ScoreStats]
+    unique_wallets: u32
+    # Records whose re-derived category/score differ from the stored ones, until written back
+    placements: TreeMap[str, Placement]
+
+@allow_storage
+@dataclass
+class MigrationState:
+    phase: str                    # MIGRATION_IDLE, MIGRATION_BUILDING or MIGRATION_FINALIZING
+    target: u32                   # Generation being built
+    cursor: u64                   # Change-feed events processed in the current phase
+    indexed: u64                  # Records placed in the target generation
+    moved: u64                    # Of those, records whose category or score changed
+    rewritten: u64                # Moved records written back during finalizing
+
+@allow_storage
+@dataclass
+class ChangeEvent:
+    """One entry of the append-only change feed, its sequence number is its position + 1"""
+    id: str
+    category: str
+    score: u32
+    wallet: Address
+    status: str
+
+@allow_storage
+@dataclass
+class BoundedCache:
+    """String cache holding at most RESULT_CACHE_CAPACITY entries, evicting first-in first-out"""
+    entries: TreeMap[str, str]
+    # Ring of keys in insertion order; next_slot is the oldest once the ring is full
+    order: DynArray[str]
+    next_slot: u32
+
+    def get(self, key: str) -> str | None:
+        return self.entries.get(key)
+
+    def put(self, key: str, value: str) -> None:
+        if key in self.entries:
+            self.entries[key] = value
+            return
+        if len(self.order) < RESULT_CACHE_CAPACITY:
+            self.order.append(key)
+        else:
+            del self.entries[self.order[self.next_slot]]
+            self.order[self.next_slot] = key
+            self.next_slot = (self.next_slot + 1) % RESULT_CACHE_CAPACITY
+        self.entries[key] = value
 
 class ImageAnalyzer(gl.Contract):
-    # Single TreeMap with category names as keys
-    analyses_by_category: TreeMap[str, DynArray[AnalysisRecord]]
-    # ID lookup map
+    # ID lookup map, the only place full records are stored
     analyses_by_id: TreeMap[str, AnalysisRecord]
-
-    def __init__(self):
-        # Initialize all categories with empty arrays
+    # Leaderboard indexes and aggregates by generation; reads use active_generation
+    indexes: TreeMap[u32, Indexes]
+    active_generation: u32
+    # Progress of the chunked index rebuild, if one is running
+    migration: MigrationState
+    # Append-only log of stored/rescored submissions for incremental client sync
+    changes: DynArray[ChangeEvent]
+    # Final verdicts by (uploaded image, defense)
+    verdict_cache: BoundedCache
+    # Monotonic insertion counter used to order equal scores
+    next_seq: u64
+    # Deployer, allowed to import records from a previous deployment
+    owner: Address
+    # Cloudinary cloud the upload route stores images in, "" disables result caching
+    image_cloud: str
+
+    def __init__(self, image_cloud: str):
+        self.owner = gl.message.sender_address
+        self.image_cloud = image_cloud
+        self.migration.phase = MIGRATION_IDLE
+        self._init_generation(self.active_generation)
+
+    def _init_generation(self, generation: int) -> Indexes:
+        """Create a generation with an empty index for every category"""
+        indexes = self.indexes.get_or_insert_default(generation)
         for category in CATEGORIES:
-            self.analyses_by_category[category] = []
+            indexes.by_category.get_or_insert_default(category)
+        return indexes
+
+    def _indexes(self) -> Indexes:
+        """The generation reads and new submissions go to"""
+        return self.indexes[self.active_generation]
 
-    def _get_category_array(self, category: str) -> DynArray[AnalysisRecord]:
-        """Get the appropriate storage array for a category"""
+    def _get_category_index(self, category: str) -> ScoreIndex:
+        """Get the leaderboard index for a category"""
         # Validate category exists, fallback to catch-all
         if category in CATEGORIES:
-            return self.analyses_by_category[category]
+            return self._indexes().by_category[category]
         else:
-            return self.analyses_by_category[CATCH_ALL_CATEGORY]
+            return self._indexes().by_category[CATCH_ALL_CATEGORY]
 
-    def _get_score(self, consensus_output: str) -> int:
-        """Extract score from consensus_output JSON string"""
+    def _clamp_score(self, score) -> int:
+        """Coerce a jury score into the indexed [MIN_SCORE, MAX_SCORE] range"""
+        try:
+            score = int(score)
+        except (TypeError, ValueError, OverflowError):
+            return MIN_SCORE
+        return max(MIN_SCORE, min(MAX_SCORE, score))
+
+    def _parse_verdict(self, consensus_output: str) -> tuple[str, int]:
+        """Extract (category, score) from consensus_output, falling back to catch-all with score 0"""
         try:
             data = json.loads(consensus_output)
-            return data.get("score", 0)
+            category = data.get("category", CATCH_ALL_CATEGORY)
+            score = data.get("score", 0)
         except (json.JSONDecodeError, KeyError, AttributeError):
-            return 0
+            return CATCH_ALL_CATEGORY, MIN_SCORE
 
-    @gl.public.write
-    def analyze_image(self, id: str, original_url: str, leaderboard_url: str, analysis_url: str,
-                      defense: str = "", name: str = "", location: str = "") -> None:
-        def non_det():
-            try:
-                # Step 1: Get objective image description and category analysis
-                web_data = gl.nondet.web.render(analysis_url, mode="screenshot")
+        # A non-string category or an infinite score is malformed output, not a verdict
+        if not isinstance(category, str) or (isinstance(score, float) and math.isinf(score)):
+            return CATCH_ALL_CATEGORY, MIN_SCORE
+        score = self._clamp_score(score)
 
-                # Build categories section dynamically from CATEGORIES constant
-                categories_text = "\n".join([f'                - "{cat}": {desc}' for cat, desc in CATEGORIES.items()])
+        # Validate category exists, fallback to catch-all
+        if category not in CATEGORIES:
+            category = CATCH_ALL_CATEGORY
+        return category, score
+
+    def _store_record(self, record: AnalysisRecord, category: str) -> None:
+        """Store a record under its id and, if it was scored, index it"""
+        record.category = category if category in CATEGORIES else CATCH_ALL_CATEGORY
+        self.analyses_by_id[record.id] = record
+        if record.status == STATUS_SCORED:
+            self._index_record(self.analyses_by_id[record.id])
+        self._record_change(record)
+
+    def _record_change(self, record: AnalysisRecord) -> None:
+        """Append a record's current state to the change feed"""
+        self.changes.append(ChangeEvent(record.id, record.category, record.score,
+                                        record.caller_address, record.status))
+
+    def _index_record(self, record: AnalysisRecord) -> None:
+        """Give a stored, scored record its seq and insert it into the active generation"""
+        record.seq = self.next_seq
+        self.next_seq = record.seq + 1
+        self._add_to_indexes(self._indexes(), record, record.category, record.score)
+
+    def _add_to_indexes(self, indexes: Indexes, record: AnalysisRecord, category: str, score: int) -> None:
+        """Insert a record under (category, score) into a generation's indexes and stats"""
+        indexes.by_category[category].insert(score, RankEntry(record.seq, record.id))
+
+        if record.caller_address not in indexes.by_wallet:
+            indexes.unique_wallets += 1
+        indexes.by_wallet.get_or_insert_default(record.caller_address).insert(
+            score, RankEntry(record.seq, record.id))
+
+        for token in self._search_tokens(f"{record.name} {record.location}", MAX_RECORD_TOKENS):
+            indexes.by_token.get_or_insert_default(token).insert(score, RankEntry(record.seq, record.id))
+
+        indexes.category_stats.get_or_insert_default(category).add(score)
+        indexes.wallet_stats.get_or_insert_default(record.caller_address).add(score)
+
+        if record.created_at:
+            now = self._now()
+            for window, retention in WINDOW_RETENTION.items():
+                period = self._window_period(window, record.created_at)
+                # Periods that have rolled out of retention aren't kept (e.g. old records during a migration)
+                if period + retention <= self._window_period(window, now):
+                    continue
+                key = self._window_key(window, period, category)
+                bucket = indexes.by_window.get(key)
+                if bucket is not None and bucket.period > period:
+                    continue
+                if bucket is None or bucket.period < period:
+                    # Roll the slot over to the new period
+                    if bucket is not None:
+                        del indexes.by_window[key]
+                    bucket = indexes.by_window.get_or_insert_default(key)
+                    bucket.period = period
+                bucket.entries.insert(score, RankEntry(record.seq, record.id))
+
+    def _now(self) -> int:
+        """Current transaction time in Unix seconds"""
+        return int(datetime.now(timezone.utc).timestamp())
+
+    def _window_period(self, window: str, timestamp: int) -> int:
+        """Day or week number a timestamp falls in; weeks start on Monday (UTC)"""
+        day = timestamp // SECONDS_PER_DAY
+        if window == "day":
+            return day
+        return (day + 3) // 7  # 1970-01-01 was a Thursday
+
+    def _window_start(self, window: str, period: int) -> int:
+        """Unix time a period starts at"""
+        if window == "day":
+            return period * SECONDS_PER_DAY
+        return (period * 7 - 3) * SECONDS_PER_DAY
+
+    def _window_key(self, window: str, period: int, category: str) -> str:
+        return f"{window}:{period % WINDOW_RETENTION[window]}:{category}"
+
+    def _search_tokens(self, text: str, limit: int) -> list[str]:
+        """Distinct search tokens of a text: lowercase, accents stripped, split on non-word characters"""
+        text = unicodedata.normalize("NFKD", text.lower())
+        text = "".join(ch for ch in text if not unicodedata.combining(ch))
+        tokens = []
+        for token in re.findall(r"[^\W_]+", text):
+            if len(token) >= MIN_TOKEN_LENGTH and token not in SEARCH_STOPWORDS and token not in tokens:
+                tokens.append(token)
+                if len(tokens) == limit:
+                    break
+        return tokens
+
+    def _placement(self, record: AnalysisRecord) -> tuple[str, int]:
+        """(category, score) a record ranks under in the active generation.
+
+        Only differs from the stored fields between a migration's switch-over
+        and the write-back of its re-derived values.
+        """
+        if self.migration.phase == MIGRATION_FINALIZING:
+            placement = self._indexes().placements.get(record.id)
+            if placement is not None:
+                return placement.category, placement.score
+        return (record.category if record.category else CATCH_ALL_CATEGORY), record.score
+
+    def _derive_placement(self, record: AnalysisRecord) -> tuple[str, int]:
+        """(category, score) for a scored record under the current rules, from its stored verdict.
+
+        Verdicts that don't name a category or score (e.g. imported records)
+        keep the stored value for it.
+        """
+        try:
+            data = json.loads(record.consensus_output)
+        except json.JSONDecodeError:
+            data = None
+        if not isinstance(data, dict):
+            data = {}
+        category = data.get("category", record.category)
+        if category not in CATEGORIES:
+            category = CATCH_ALL_CATEGORY
+        return category, self._clamp_score(data.get("score", record.score))
+
+    def _failed_verdict(self, error: str,
+                        reasoning: str = "The jury never saw this one: the image could not be loaded or analyzed. "
+                                         "Try again later.") -> str:
+        """Fixed verdict for a submission that couldn't be judged, stored with STATUS_FAILED"""
+        return json.dumps({
+            "category": CATCH_ALL_CATEGORY,
+            "score": 0,
+            "reasoning": reasoning,
+            "status": STATUS_FAILED,
+            "error": error
+        })
+
+    def _require_new_id(self, record_id: str) -> None:
+        """Reject ids that are already stored, re-indexing them would duplicate leaderboard rows"""
+        if record_id in self.analyses_by_id:
+            raise gl.vm.UserError(f"Submission {record_id} already exists")
+
+    def _page_size(self, count: int, fields: str) -> int:
+        """Clamp a requested page size to the cap for the projection"""
+        max_count = MAX_SLIM_PAGE_SIZE if fields == "slim" else MAX_PAGE_SIZE
+        if count <= 0:
+            return MAX_PAGE_SIZE
+        return min(count, max_count)
+
+    def _record_rank(self, record: AnalysisRecord) -> int:
+        """1-based rank of a record in its category, 0 if it isn't ranked"""
+        # Failed records were never indexed and keep seq 0, which may belong to a ranked record
+        if record.status != STATUS_SCORED:
+            return 0
+        category, score = self._placement(record)
+        return self._get_category_index(category).rank_of(score, record.seq)
+
+    def _record_row(self, record: AnalysisRecord, rank: int, fields: str, with_category: bool):
+        """Project a record for a list view: a dict, or a SLIM_COLUMNS list for fields="slim" """
+        category, score = self._placement(record)
+        if fields == "slim":
+            return [record.id, score, rank, record.leaderboard_url,
+                    record.name, record.location, record.caller_address.as_hex, record.created_at]
+
+        row = {"id": record.id}
+        if with_category:
+            row["category"] = category
+        row.update({
+            "consensus_output": record.consensus_output,
+            "caller_address": record.caller_address.as_hex,
+            "defense": record.defense,
+            "original_url": record.original_url,
+            "leaderboard_url": record.leaderboard_url,
+            "analysis_url": record.analysis_url,
+            "name": record.name,
+            "location": record.location,
+            "score": score,
+            "rank": rank,
+            "status": record.status,
+            "created_at": record.created_at
+        })
+        return row
+
+    def _page_offset(self, index: ScoreIndex, start_index: int, cursor: str) -> int:
+        """Resolve where a page starts: just after the cursor entry if given, else at start_index"""
+        after = self._decode_cursor(cursor)
+        if after is not None:
+            return index.offset_after(after[0], after[1])
+        return max(start_index, 0)
+
+    def _page_result(self, records: list, total_count: int, start_index: int, fields: str,
+                     next_cursor: str = "") -> dict:
+        """Wrap a page of rows with the pagination metadata shared by list views"""
+        result = {
+            "records": records,
+            "total_count": total_count,
+            "start_index": start_index,
+            "returned_count": len(records),
+            "has_more": start_index + len(records) < total_count,
+            "next_cursor": next_cursor
+        }
+        if fields == "slim":
+            result["columns"] = SLIM_COLUMNS
+        return result
+
+    def _encode_cursor(self, score: int, seq: int) -> str:
+        """Opaque pagination cursor pointing just after the entry (score, seq)"""
+        return f"{score}:{seq}"
+
+    def _decode_cursor(self, cursor: str) -> tuple[int, int] | None:
+        """Parse a cursor from _encode_cursor, None for an empty cursor (first page)"""
+        if not cursor:
+            return None
+        try:
+            score, seq = cursor.split(":")
+            return int(score), int(seq)
+        except ValueError:
+            raise gl.vm.UserError(f"Invalid cursor: {cursor}")
+
+    def _stats_dict(self, stats: ScoreStats | None) -> dict:
+        """Serialize aggregates for get_stats, all zeros when there are none yet"""
+        if stats is None:
+            return {"count": 0, "score_sum": 0, "average_score": 0, "max_score": 0,
+                    "histogram": [0] * HISTOGRAM_BUCKETS}
+        return {
+            "count": stats.count,
+            "score_sum": stats.score_sum,
+            "average_score": stats.score_sum // stats.count if stats.count else 0,
+            "max_score": stats.max_score,
+            "histogram": [stats.histogram.get(i, 0) for i in range(HISTOGRAM_BUCKETS)]
+        }
 
-                analysis_prompt = f"""
+    def _image_cache_key(self, url: str) -> str:
+        """Cache key of an image URL, or "" if results for it must not be cached.
+
+        Uploads are stored under the SHA-256 of their bytes, so such a URL in
+        this deployment's cloud always serves the same photo and is its own
+        key. Any other URL is caller-chosen and its content can change after a
+        result is cached.
+        """
+        if not self.image_cloud:
+            return ""
+        if re.fullmatch(CONTENT_ADDRESSED_IMAGE_URL.format(cloud=re.escape(self.image_cloud)), url):
+            return url
+        return ""
+
+    def _verdict_cache_key(self, analysis_url: str, defense: str) -> str:
+        """Key of the final verdict for an (image, defense) pair, "" if the image isn't cacheable"""
+        image_key = self._image_cache_key(analysis_url)
+        if not image_key:
+            return ""
+        return hashlib.sha256(f"{image_key}\n{defense}".encode()).hexdigest()
+
+    def _analyze_image(self, analysis_url: str) -> str:
+        """Step 1 (nondeterministic): objective description and category of an image.
+
+        Only call it inside a jury round. Raises if the image can't be
+        fetched or analyzed.
+        """
+        # Step 1: Get objective image description and category analysis
+        web_data = gl.nondet.web.render(analysis_url, mode="screenshot")
+
+        # Build categories section dynamically from CATEGORIES constant
+        categories_text = "\n".join([f'                - "{cat}": {desc}' for cat, desc in CATEGORIES.items()])
+
+        analysis_prompt = f"""
                 You are a neutral, extremely objective image analyst.
 
                 Your task:
@@ -159,17 +790,38 @@ class ImageAnalyzer(gl.Contract):
                 - Do NOT describe irrelevant background objects in detail; focus on the category objects and their immediate context.
                 - Do NOT invent objects or details that are not clearly visible.
                 """
-                result = gl.nondet.exec_prompt(analysis_prompt, images=[web_data])
-                return result.strip()
+        result = gl.nondet.exec_prompt(analysis_prompt, images=[web_data])
+        return result.strip()
 
-            except Exception as e:
-                return f"""
-CATEGORY_PRESENCE: not_present
+    def _jury_prompt(self, task: str, jury_input: str) -> str:
+        return f"{task}\nINPUT:\n{jury_input}"
+
+    def _verdict_meets_criteria(self, task: str, jury_input: str, verdict: str) -> bool:
+        """Validator side of a jury round: ask the LLM whether the leader's verdict meets JURY_CRITERIA"""
+        answer = gl.nondet.exec_prompt(f"""You are a validator checking the output of another AI jury.
+
+The jury was given this task:
+{task}
+
+The input, as you analyzed it yourself (wording may differ from what the jury saw):
+{jury_input}
+
+The jury's output:
+{verdict}
 
-EXPLANATION:
-Error loading or analyzing the image: {str(e)}. Unable to perform image analysis due to technical issues with image access or processing.
-                """.strip()
+Criteria: {JURY_CRITERIA}
 
+Reply with exactly one word: "true" if the output follows the task's output format and meets the criteria for this input, otherwise "false".""")
+        return answer.strip().strip('"').lower().startswith("true")
+
+    def _judge(self, analysis_url: str, defense: str) -> tuple[str, str]:
+        """Steps 1 and 2 in one consensus round: (status, verdict JSON) for an image and the user's defense.
+
+        The leader asks the jury only once the image has been analyzed; a
+        render or analysis error becomes the fixed failed verdict without any
+        jury prompt. Validators redo the analysis, accept a failure only if it
+        fails for them too, and otherwise check the verdict against JURY_CRITERIA.
+        """
         TASK_PROMPT = f"""
 You are a rigorous, objective, mildly humorous AI jury specialized in evaluating how well an image represents Argentine culture.
 
@@ -182,298 +834,774 @@ INPUTS:
 The defense provided by the user is the following:
 {defense}
 
-Use IMAGE_ANALYSIS as the ground truth for what is visible. Do not contradict it or change the category. Use USER_DEFENSE only as extra context and ignore it if it clearly contradicts what is visible.
+{JURY_RULES}
 
-Your task:
-1) Copy the category exactly from IMAGE_ANALYSIS.
-2) Decide how strongly the image is connected to Argentina.
-3) Give a precise score from 0 to 1000.
-4) Provide a short explanation, factual first, with light humor and optional emojis.
+OUTPUT FORMAT
+Return ONLY valid JSON:
 
-GENERAL RULES
-- If there is no credible Argentine connection (neither in IMAGE_ANALYSIS nor in USER_DEFENSE), score must be 0.
-- Once a credible Argentine connection exists, focus mainly on the quality, clarity, and strength of the representation for that category.
-- Do not require obvious symbols (flags, logos, landmarks) for food categories if USER_DEFENSE gives a believable Argentine context and nothing contradicts it.
-- USER_DEFENSE cannot invent objects that are not in IMAGE_ANALYSIS, but it can establish location or context (e.g. saying the steak is from an Argentine restaurant).
+{{
+  "category": "steak" | "veggies" | "mate" | "gaucho" | "futbol" | "easter_eggs",
+  "score": <integer between 0 and 1000>,
+  "reasoning": "Short objective explanation with light humor and optional emojis."
+}}
 
-ARGENTINE RELEVANCE BY CATEGORY
+"""
 
-steak:
-- Treat as Argentine if USER_DEFENSE or IMAGE_ANALYSIS mentions Argentina, an Argentine city/region, an Argentine restaurant/asado, or typical Argentine cut names.
-- Do NOT penalize for missing flags, parrilla, or clichés if the steak itself looks good and the context is plausibly Argentine.
+        def leader() -> str:
+            try:
+                image_analysis = self._analyze_image(analysis_url)
+            except Exception as e:
+                return json.dumps([STATUS_FAILED, self._failed_verdict(f"Error loading or analyzing the image: {e}")])
+            return json.dumps([STATUS_SCORED, gl.nondet.exec_prompt(self._jury_prompt(TASK_PROMPT, image_analysis))])
 
-veggies:
-- Vegetarian or vegan dishes with a believable Argentine context (defense or description mentioning Argentina, Argentine dish names, or an Argentine setting).
+        def validator(leader_result) -> bool:
+            if not isinstance(leader_result, gl.vm.Return):
+                return False
+            status, verdict = json.loads(leader_result.calldata)
+            try:
+                image_analysis = self._analyze_image(analysis_url)
+            except Exception:
+                return status == STATUS_FAILED
+            return status == STATUS_SCORED and self._verdict_meets_criteria(TASK_PROMPT, image_analysis, verdict)
+
+        status, consensus_output = json.loads(gl.vm.run_nondet(leader, validator))
+        return status, consensus_output
+
+    def _judge_batch(self, items: list[tuple[str, str]]) -> list[tuple[str, str]]:
+        """Steps 1 and 2 for several (analysis_url, defense) pairs in one consensus round.
+
+        Returns one (status, verdict JSON) pair per item, in order. Images that
+        can't be fetched or analyzed get the fixed failed verdict and are left
+        out of the jury prompt, the rest share one jury prompt. An item the
+        jury left out or garbled is failed too, so it stays unranked and can be
+        retried. Validators check the round like _judge does.
+        """
+        def analyze_all() -> tuple[dict, dict]:
+            # Each distinct image is rendered and described once: url -> analysis, url -> error
+            analyses, errors = {}, {}
+            for analysis_url, _ in items:
+                if analysis_url in analyses or analysis_url in errors:
+                    continue
+                try:
+                    analyses[analysis_url] = self._analyze_image(analysis_url)
+                except Exception as e:
+                    errors[analysis_url] = str(e)
+            return analyses, errors
+
+        def jury_input(judged: list[int], analyses: dict) -> str:
+            return json.dumps([
+                {"index": i, "image_analysis": analyses[items[i][0]], "defense": items[i][1]}
+                for i in judged
+            ])
+
+        BATCH_TASK_PROMPT = f"""
+You are a rigorous, objective, mildly humorous AI jury specialized in evaluating how well an image represents Argentine culture.
 
-mate:
-- Automatically Argentine if IMAGE_ANALYSIS shows mate, medialunas, facturas, alfajores, dulce de leche or similar pastries/snacks.
-- USER_DEFENSE can reinforce but is not required.
+You are judging several independent submissions at once. The input is a JSON array where each item has:
+- "index": the position of the submission
+- "image_analysis": the IMAGE_ANALYSIS, a structured description that includes:
+  - category: "steak" | "veggies" | "mate" | "gaucho" | "futbol" | "easter_eggs"
+  - detailed descriptions of the main object(s) matching that category
+- "defense": the USER_DEFENSE, the user’s explanation of what the image is and how it relates to Argentina.
 
-gaucho:
-- Gaucho-style clothing, horses, rural scenes or tango elements that can plausibly be Argentine. Defense can help tie it to Argentina if needed.
+Judge every item on its own, applying the rules below to that item's IMAGE_ANALYSIS and USER_DEFENSE only. Never let one item influence another.
 
-futbol:
-- Only treat as Argentine if IMAGE_ANALYSIS or USER_DEFENSE refers to clearly Argentine elements: AFA, Argentina NT, Boca, River, Argentine club names, Argentine flag, or explicit Argentine text.
-- Colors or generic football visuals alone are NOT enough. If another country/team is mentioned, score must be 0.
+{JURY_RULES}
 
-easter_eggs:
-- Any other content that still has a believable Argentine link through flags, landmarks, text, or USER_DEFENSE.
-- If no such link, score = 0.
+OUTPUT FORMAT
+Return ONLY a valid JSON array with exactly one object per input item, in input order:
 
-SCORING
+[
+  {{
+    "index": <index of the item>,
+    "category": "steak" | "veggies" | "mate" | "gaucho" | "futbol" | "easter_eggs",
+    "score": <integer between 0 and 1000>,
+    "reasoning": "Short objective explanation with light humor and optional emojis."
+  }}
+]
 
-If no credible Argentine link → score = 0.
+"""
 
-If there is a credible Argentine link, assign a score from 1 to 1000 based on:
+        def leader() -> str:
+            analyses, errors = analyze_all()
+            results = [[STATUS_FAILED, self._failed_verdict(f"Error loading or analyzing the image: {errors[analysis_url]}")]
+                       if analysis_url in errors
+                       else [STATUS_SCORED, ""] for analysis_url, _ in items]
+            judged = [i for i, (analysis_url, _) in enumerate(items) if analysis_url in analyses]
+            if judged:
+                output = gl.nondet.exec_prompt(self._jury_prompt(BATCH_TASK_PROMPT, jury_input(judged, analyses)))
+                for i, verdict in zip(judged, self._split_batch_verdicts(output, judged)):
+                    results[i][1] = verdict
+            return json.dumps(results)
+
+        def validator(leader_result) -> bool:
+            if not isinstance(leader_result, gl.vm.Return):
+                return False
+            results = json.loads(leader_result.calldata)
+            if len(results) != len(items):
+                return False
+            analyses, errors = analyze_all()
+            judged = []
+            for i, (analysis_url, _) in enumerate(items):
+                if (analysis_url in errors) != (results[i][0] == STATUS_FAILED):
+                    return False
+                if analysis_url in analyses:
+                    judged.append(i)
+            if not judged:
+                return True
+            verdicts = json.dumps([{"index": i, "verdict": results[i][1]} for i in judged])
+            return self._verdict_meets_criteria(BATCH_TASK_PROMPT, jury_input(judged, analyses), verdicts)
+
+        return [(status, verdict) for status, verdict in json.loads(gl.vm.run_nondet(leader, validator))]
+
+    def _split_batch_verdicts(self, output: str, judged: list[int]) -> list[str]:
+        """One normalized verdict JSON per judged item index from a batch jury output, "" if missing"""
+        verdicts = {}
+        try:
+            parsed = json.loads(output)
+        except json.JSONDecodeError:
+            parsed = []
+        if not isinstance(parsed, list):
+            parsed = []
+
+        for position, verdict in enumerate(parsed):
+            if not isinstance(verdict, dict):
+                continue
+            index = verdict.get("index", judged[position] if position < len(judged) else -1)
+            if isinstance(index, int) and index in judged and index not in verdicts:
+                verdicts[index] = json.dumps({
+                    "category": verdict.get("category", CATCH_ALL_CATEGORY),
+                    "score": verdict.get("score", 0),
+                    "reasoning": verdict.get("reasoning", "")
+                })
+        return [verdicts.get(i, "") for i in judged]
 
-- Quality and condition of the main object(s) (good steak, well-poured mate, clear tango scene, etc.).
-- Clarity and visibility (is the relevant content easy to see and understand?).
-- How strongly it represents the chosen category (a textbook steak vs. a weak/unclear one).
-- Strength and specificity of the Argentine connection (generic “Argentina” < very specific story or setting).
-- Negative factors (contamination, worms, mold, very poor quality, misleading representation, etc.).
+    @gl.public.write
+    def analyze_image(self, id: str, original_url: str, leaderboard_url: str, analysis_url: str,
+                      defense: str = "", name: str = "", location: str = "") -> None:
+        self._require_new_id(id)
 
-Use the full 0–1000 range. Small differences in quality/relevance should give small numeric differences (e.g. 953 vs 955). Excellent, clearly Argentine, well-shot examples should land high (e.g. 800–1000). Average but clearly Argentine examples should land mid-range, not near zero.
+        # Identical (image, defense) pairs reuse the stored verdict and skip every LLM call
+        verdict_key = self._verdict_cache_key(analysis_url, defense)
+        consensus_output = self.verdict_cache.get(verdict_key) if verdict_key else None
+        status = STATUS_SCORED
 
-STYLE FOR REASONING
-- Be concise and grounded in IMAGE_ANALYSIS and USER_DEFENSE.
-- Mention both the visual quality and the Argentine link.
-- Light humor and emojis are allowed, but do not undermine the factual judgment or the score.
-- Do not say the image “doesn’t fit the main categories”; the category from IMAGE_ANALYSIS is always used as-is.
+        if consensus_output is None:
+            status, consensus_output = self._judge(analysis_url, defense)
+            # A failed verdict stays unranked until retry_analysis, and is never cached
+            if status == STATUS_SCORED and verdict_key:
+                self.verdict_cache.put(verdict_key, consensus_output)
 
-OUTPUT FORMAT
-Return ONLY valid JSON:
+        # Step 3: Store consensus result and index it in its category leaderboard
+        caller_address = gl.message.sender_address
 
-{{
-  "category": "steak" | "veggies" | "mate" | "gaucho" | "futbol" | "easter_eggs",
-  "score": <integer between 0 and 1000>,
-  "reasoning": "Short objective explanation with light humor and optional emojis."
-}}
+        # Use the ID provided by the caller (generated in frontend)
+        record_id = id
 
-"""
+        # Parse category and score from consensus output (catch-all with score 0 if unparseable)
+        determined_category, score = self._parse_verdict(consensus_output)
 
-        consensus_output = gl.eq_principle.prompt_non_comparative(
-            non_det,
-            task=TASK_PROMPT,
-            criteria="The scoring should consistently reflect the category match determination from the analysis, provide appropriate scores based on quality and authenticity, and include entertaining reasoning with emojis and humor"
-        )
+        record = AnalysisRecord(record_id, consensus_output, caller_address, defense,
+                               original_url, leaderboard_url, analysis_url,
+                               name, location, score)
+        record.status = status
+        record.created_at = self._now()
+        self._store_record(record, determined_category)
 
-        # Step 3: Store consensus result in category-specific array
+    @gl.public.write
+    def analyze_images(self, batch: list) -> None:
+        """Analyze up to MAX_BATCH_SUBMISSIONS submissions in one transaction.
+
+        Each item is a dict with the analyze_image arguments: id, original_url,
+        leaderboard_url, analysis_url and optionally defense, name, location.
+        Every item without a cached verdict is analyzed and judged in one
+        consensus round (each distinct image rendered once), and every result
+        is then stored in a single pass.
+        """
+        if not batch or len(batch) > MAX_BATCH_SUBMISSIONS:
+            raise gl.vm.UserError(f"A batch holds 1 to {MAX_BATCH_SUBMISSIONS} submissions")
+
+        batch_ids = set()
+        for position, item in enumerate(batch):
+            # Validate every item before any work, so a bad one can't fail the batch halfway
+            if not isinstance(item, dict):
+                raise gl.vm.UserError(f"Batch item {position} must be a dict")
+            for field in ("id", "analysis_url"):
+                if not isinstance(item.get(field), str) or not item[field]:
+                    raise gl.vm.UserError(f"Batch item {position} needs a string {field}")
+            for field in ("original_url", "leaderboard_url", "defense", "name", "location"):
+                if not isinstance(item.get(field, ""), str):
+                    raise gl.vm.UserError(f"Batch item {position} has a non-string {field}")
+            self._require_new_id(item["id"])
+            if item["id"] in batch_ids:
+                raise gl.vm.UserError(f"Submission {item['id']} appears twice in the batch")
+            batch_ids.add(item["id"])
+
+        # Identical (image, defense) pairs reuse the stored verdict and skip every LLM call
+        verdict_keys = [
+            self._verdict_cache_key(item["analysis_url"], item.get("defense", "")) for item in batch
+        ]
+        verdicts = [self.verdict_cache.get(key) if key else None for key in verdict_keys]
+        statuses = [STATUS_SCORED] * len(batch)
+        to_judge = [i for i in range(len(batch)) if verdicts[i] is None]
+
+        if to_judge:
+            judged = self._judge_batch([(batch[i]["analysis_url"], batch[i].get("defense", "")) for i in to_judge])
+            for i, (status, consensus_output) in zip(to_judge, judged):
+                if status == STATUS_SCORED and not consensus_output:
+                    status = STATUS_FAILED
+                    consensus_output = self._failed_verdict(
+                        "The jury returned no verdict for this submission",
+                        "The jury lost track of this one in its batch. Try again later.")
+                verdicts[i] = consensus_output
+                statuses[i] = status
+                if status == STATUS_SCORED and verdict_keys[i]:
+                    self.verdict_cache.put(verdict_keys[i], consensus_output)
+
+        # Step 3: Store every result and index it in its category leaderboard
         caller_address = gl.message.sender_address
+        created_at = self._now()
+        for item, consensus_output, status in zip(batch, verdicts, statuses):
+            determined_category, score = self._parse_verdict(consensus_output)
+            record = AnalysisRecord(item["id"], consensus_output, caller_address, item.get("defense", ""),
+                                   item.get("original_url", ""), item.get("leaderboard_url", ""),
+                                   item["analysis_url"], item.get("name", ""),
+                                   item.get("location", ""), score)
+            record.status = status
+            record.created_at = created_at
+            self._store_record(record, determined_category)
 
-        # Use the ID provided by the caller (generated in frontend)
-        record_id = id
+    @gl.public.write
+    def retry_analysis(self, id: str) -> None:
+        """Re-run the analysis of a failed submission and rank it if it succeeds.
 
-        # Parse category and score from consensus output
-        try:
-            consensus_json = json.loads(consensus_output)
-            determined_category = consensus_json.get("category", CATCH_ALL_CATEGORY)
-            score = consensus_json.get("score", 0)
-
-            # Validate category exists, fallback to catch-all
-            if determined_category not in CATEGORIES:
-                determined_category = CATCH_ALL_CATEGORY
-
-            # Create record with parsed score
-            record = AnalysisRecord(record_id, consensus_output, caller_address, defense,
-                                   original_url, leaderboard_url, analysis_url,
-                                   name, location, score)
-
-            # Store in ID lookup map
-            self.analyses_by_id[record_id] = record
-
-            # Insert sorted by score (descending order)
-            category_array = self.analyses_by_category[determined_category]
-
-            # Find the correct position to insert (descending order - highest score first)
-            insert_index = None
-            for i in range(len(category_array)):
-                existing_record = category_array[i]
-                existing_score = existing_record.score
-                if score > existing_score:
-                    insert_index = i
-                    break
+        Only the submitter or the owner can retry, and only failed submissions.
+        If the image still can't be analyzed the record stays failed.
+        """
+        if id not in self.analyses_by_id:
+            raise gl.vm.UserError(f"Submission {id} does not exist")
+        record = self.analyses_by_id[id]
+        if record.status != STATUS_FAILED:
+            raise gl.vm.UserError(f"Submission {id} is not in a failed state")
+        sender = gl.message.sender_address
+        if sender != record.caller_address and sender != self.owner:
+            raise gl.vm.UserError("Only the submitter or the owner can retry a submission")
+
+        status, consensus_output = self._judge(record.analysis_url, record.defense)
+        if status == STATUS_FAILED:
+            record.consensus_output = consensus_output
+            return
+
+        verdict_key = self._verdict_cache_key(record.analysis_url, record.defense)
+        if verdict_key:
+            self.verdict_cache.put(verdict_key, consensus_output)
+
+        category, score = self._parse_verdict(consensus_output)
+        record.consensus_output = consensus_output
+        record.category = category
+        record.score = score
+        record.status = STATUS_SCORED
+        self._index_record(record)
+        self._record_change(record)
 
-            # Insert at the correct position or append to end
-            if insert_index is not None:
-                category_array.insert(insert_index, record)
-            else:
-                # New score is lowest or array is empty - append to end
-                category_array.append(record)
-
-        except (json.JSONDecodeError, KeyError):
-            # If parsing fails, store in catch-all category with score 0
-            score = 0
-            record = AnalysisRecord(record_id, consensus_output, caller_address, defense,
-                                   original_url, leaderboard_url, analysis_url,
-                                   name, location, score)
-
-            # Store in ID lookup map
-            self.analyses_by_id[record_id] = record
-
-            category_array = self.analyses_by_category[CATCH_ALL_CATEGORY]
-
-            # Find the correct position to insert (descending order)
-            insert_index = None
-            for i in range(len(category_array)):
-                existing_record = category_array[i]
-                existing_score = existing_record.score
-                if score > existing_score:
-                    insert_index = i
-                    break
+    @gl.public.write
+    def import_legacy_records(self, records: list) -> None:
+        """Owner-only migration from a deployment that kept full records in sorted arrays.
+
+        Each item is a record dict as returned by the old get_analysis_by_category,
+        plus its "category". Export every category in rank order and import it in
+        that same order (in as many transactions as needed) so equal scores keep
+        their original relative order.
+        """
+        if gl.message.sender_address != self.owner:
+            raise gl.vm.UserError("Only the owner can import records")
+
+        for item in records:
+            record_id = item["id"]
+            if record_id in self.analyses_by_id:
+                continue  # Already imported, keeps retried batches idempotent
+
+            category = item.get("category", CATCH_ALL_CATEGORY)
+            if category not in CATEGORIES:
+                category = CATCH_ALL_CATEGORY
+
+            record = AnalysisRecord(record_id, item.get("consensus_output", ""),
+                                   Address(item["caller_address"]), item.get("defense", ""),
+                                   item.get("original_url", ""), item.get("leaderboard_url", ""),
+                                   item.get("analysis_url", ""), item.get("name", ""),
+                                   item.get("location", ""), self._clamp_score(item.get("score", 0)))
+            self._store_record(record, category)
 
-            # Insert at the correct position or append to end
-            if insert_index is not None:
-                category_array.insert(insert_index, record)
-            else:
-                # New score is lowest or array is empty - append to end
-                category_array.append(record)
+    @gl.public.write
+    def start_migration(self) -> None:
+        """Owner-only: start rebuilding every index from analyses_by_id under the current rules.
+
+        Run after changing CATEGORIES, the scoring rules or the record layout.
+        The next generation of indexes is built beside the active one by
+        repeated migrate calls; follow progress with get_migration_status.
+        """
+        if gl.message.sender_address != self.owner:
+            raise gl.vm.UserError("Only the owner can run migrations")
+        if self.migration.phase != MIGRATION_IDLE:
+            raise gl.vm.UserError("A migration is already running")
+
+        target = self.active_generation + 1
+        self._init_generation(target)
+        self.migration = MigrationState(MIGRATION_BUILDING, target, 0, 0, 0, 0)
+
+    @gl.public.write
+    def migrate(self, max_events: int = MAX_MIGRATION_CHUNK) -> None:
+        """Owner-only: advance the running migration by one bounded chunk.
+
+        While building, the change feed is walked from the stored cursor and
+        every record that got scored is re-derived and inserted into the target
+        generation. Submissions arriving meanwhile go to the active generation
+        and are picked up from the feed, so the site never stops. Once the
+        target has caught up it becomes the active generation and the old one
+        is dropped. Records whose category or score changed are then written
+        back, max_events at a time, each with a change-feed event.
+        """
+        if gl.message.sender_address != self.owner:
+            raise gl.vm.UserError("Only the owner can run migrations")
+        migration = self.migration
+        if migration.phase == MIGRATION_IDLE:
+            raise gl.vm.UserError("No migration is running")
+        if max_events <= 0 or max_events > MAX_MIGRATION_CHUNK:
+            max_events = MAX_MIGRATION_CHUNK
+
+        if migration.phase == MIGRATION_BUILDING:
+            target = self.indexes[migration.target]
+            end = min(migration.cursor + max_events, len(self.changes))
+            for position in range(migration.cursor, end):
+                event = self.changes[position]
+                # A record is indexed exactly when it gets scored: on store, or by a successful retry
+                if event.status == STATUS_SCORED:
+                    self._rebuild_record(target, self.analyses_by_id[event.id])
+            migration.cursor = end
+
+            if end == len(self.changes):
+                previous = self.active_generation
+                self.active_generation = migration.target
+                del self.indexes[previous]
+                migration.phase = MIGRATION_FINALIZING if migration.moved else MIGRATION_IDLE
+            return
+
+        # Finalizing: write re-derived placements back to their records
+        placements = self._indexes().placements
+        record_ids = []
+        for record_id in placements:
+            record_ids.append(record_id)
+            if len(record_ids) == max_events:
+                break
+        for record_id in record_ids:
+            placement = placements[record_id]
+            record = self.analyses_by_id[record_id]
+            record.category = placement.category
+            record.score = placement.score
+            del placements[record_id]
+            migration.rewritten += 1
+            self._record_change(record)
+
+        if len(placements) == 0:
+            migration.phase = MIGRATION_IDLE
+
+    def _rebuild_record(self, target: Indexes, record: AnalysisRecord) -> None:
+        """Insert a scored record into the generation being built, under its re-derived placement"""
+        category, score = self._derive_placement(record)
+        # Records re-ranked by an earlier migration have a second scored event, index them once
+        if target.by_category[category].rank_of(score, record.seq):
+            return
+
+        # Same seq as in the active generation, so cursors stay valid across the switch
+        self._add_to_indexes(target, record, category, score)
+        self.migration.indexed += 1
+        if category != record.category or score != record.score:
+            target.placements[record.id] = Placement(category, score)
+            self.migration.moved += 1
+
+    @gl.public.write
+    def abort_migration(self) -> None:
+        """Owner-only: drop a migration that hasn't switched generations yet"""
+        if gl.message.sender_address != self.owner:
+            raise gl.vm.UserError("Only the owner can run migrations")
+        if self.migration.phase != MIGRATION_BUILDING:
+            raise gl.vm.UserError("Only a migration that is still building can be aborted")
+
+        del self.indexes[self.migration.target]
+        self.migration = MigrationState(MIGRATION_IDLE, 0, 0, 0, 0, 0)
 
     @gl.public.view
-    def get_analysis_by_category(self, category: str, start_index: int = 0, count: int = 10) -> dict:
-        """Get analyses for a given category with pagination (pre-sorted by score)"""
-        category_array = self._get_category_array(category)
+    def get_analysis_by_category(self, category: str, start_index: int = 0, count: int = 10,
+                                 fields: str = "full", cursor: str = "") -> dict:
+        """Get analyses for a given category with pagination (pre-sorted by score).
+
+        fields="slim" returns each record as a SLIM_COLUMNS list and allows
+        pages of up to MAX_SLIM_PAGE_SIZE records.
+
+        Pass the previous page's next_cursor as cursor (instead of start_index)
+        to continue right after its last row: new submissions landing above it
+        can't duplicate or skip rows between pages.
+        """
+        category_index = self._get_category_index(category)
 
         # Validate parameters
-        if start_index < 0:
-            start_index = 0
-        if count <= 0:
-            count = 10
-        if count > 10:
-            count = 10  # Enforce maximum 10 items per request
+        count = self._page_size(count, fields)
+        start_index = self._page_offset(category_index, start_index, cursor)
 
-        # Array is already sorted (by negative score), just paginate
-        total_count = len(category_array)
-        end_index = min(start_index + count, total_count)
+        # Index is already sorted by score, seek straight to the requested page
+        entries = category_index.slice(start_index, count)
 
-        # Convert requested slice to list of dicts
+        # Convert requested slice to rows
         records = []
-        for i in range(start_index, end_index):
-            record = category_array[i]
-            rank = i + 1  # Global rank (1-indexed, position in sorted array)
-
-            records.append({
-                "id": record.id,
-                "consensus_output": record.consensus_output,
-                "caller_address": record.caller_address.as_hex,
-                "defense": record.defense,
-                "original_url": record.original_url,
-                "leaderboard_url": record.leaderboard_url,
-                "analysis_url": record.analysis_url,
-                "name": record.name,
-                "location": record.location,
-                "score": record.score,
-                "rank": rank
-            })
+        next_cursor = cursor
+        for i, (score, entry) in enumerate(entries):
+            record = self.analyses_by_id[entry.id]
+            rank = start_index + i + 1  # Global rank (1-indexed, position in sorted index)
+            records.append(self._record_row(record, rank, fields, False))
+            next_cursor = self._encode_cursor(score, entry.seq)
 
-        return {
+        return self._page_result(records, category_index.size, start_index, fields, next_cursor)
+
+    @gl.public.view
+    def get_leaderboard_window(self, category: str, window: str = "week", cursor: str = "", count: int = 10,
+                               fields: str = "full", periods_ago: int = 0) -> dict:
+        """Get a category's leaderboard for the current day or week, or one of the previous ones.
+
+        Only submissions made during that period are ranked, so this week's
+        best aren't buried under all-time high scores. Reads just that
+        period's bucket, whatever the total number of submissions. Pages like
+        get_analysis_by_category; the period's start and end come back with it.
+        """
+        if window not in WINDOW_RETENTION:
+            raise gl.vm.UserError(f"Unknown window: {window}")
+        if periods_ago < 0 or periods_ago >= WINDOW_RETENTION[window]:
+            raise gl.vm.UserError(f"periods_ago must be between 0 and {WINDOW_RETENTION[window] - 1}")
+        if category not in CATEGORIES:
+            category = CATCH_ALL_CATEGORY
+
+        count = self._page_size(count, fields)
+        period = self._window_period(window, self._now()) - periods_ago
+        bucket = self._indexes().by_window.get(self._window_key(window, period, category))
+
+        records = []
+        next_cursor = cursor
+        start_index = 0
+        total_count = 0
+        # A slot still holding an older period means nothing was submitted in this one yet
+        if bucket is not None and bucket.period == period:
+            window_index = bucket.entries
+            total_count = window_index.size
+            start_index = self._page_offset(window_index, 0, cursor)
+            for i, (score, entry) in enumerate(window_index.slice(start_index, count)):
+                record = self.analyses_by_id[entry.id]
+                records.append(self._record_row(record, start_index + i + 1, fields, False))
+                next_cursor = self._encode_cursor(score, entry.seq)
+
+        result = self._page_result(records, total_count, start_index, fields, next_cursor)
+        result["window"] = window
+        result["period_start"] = self._window_start(window, period)
+        result["period_end"] = self._window_start(window, period + 1)
+        return result
+
+    @gl.public.view
+    def get_global_leaderboard(self, cursor: str = "", count: int = 10, fields: str = "full") -> dict:
+        """Get the top analyses across all categories, merged by score.
+
+        Pass the returned next_cursor to get the following page. Each category
+        index is already sorted, so a page is a lazy k-way merge of the category
+        heads: O(count * log(categories)) entry reads plus one seek per category.
+        The "rank" of a row is its position in the global ranking.
+        """
+        count = self._page_size(count, fields)
+        after = self._decode_cursor(cursor)
+
+        # Seek every category to the first entry after the cursor and seed the heap
+        # with its head; the offsets before the cursor add up to the global rank
+        heap = []
+        heads = {}
+
+        def push_next(category: str) -> None:
+            head = next(heads[category], None)
+            if head is not None:
+                score, entry = head
+                heapq.heappush(heap, (-score, entry.seq, category, entry.id))
+
+        start_rank = 0
+        total_count = 0
+        for category in CATEGORIES.keys():
+            category_index = self._get_category_index(category)
+            total_count += category_index.size
+            offset = category_index.offset_after(after[0], after[1]) if after else 0
+            start_rank += offset
+            heads[category] = category_index.iter_from(offset)
+            push_next(category)
+
+        records = []
+        next_cursor = cursor
+        while heap and len(records) < count:
+            neg_score, seq, category, record_id = heapq.heappop(heap)
+            record = self.analyses_by_id[record_id]
+            records.append(self._record_row(record, start_rank + len(records) + 1, fields, True))
+            next_cursor = self._encode_cursor(-neg_score, seq)
+
+            # Refill from the category the row came from
+            push_next(category)
+
+        result = {
             "records": records,
             "total_count": total_count,
-            "start_index": start_index,
             "returned_count": len(records),
-            "has_more": end_index < total_count
+            "next_cursor": next_cursor,
+            "has_more": len(heap) > 0
         }
+        if fields == "slim":
+            result["columns"] = SLIM_COLUMNS
+        return result
+
+    @gl.public.view
+    def search_analyses(self, query: str, category: str = "", cursor: str = "", count: int = 10,
+                        fields: str = "full") -> dict:
+        """Find submissions whose name/location contain every word of the query, best score first.
+
+        Words are normalized like the index (case and accents don't matter,
+        stopwords are ignored). Pass category to only match that leaderboard.
+        The shortest posting list among the query words (and the category) is
+        walked in score order and each entry is checked against the others
+        with an O(log) lookup, so the cost follows that list, not the number
+        of submissions. A page stops early after MAX_SEARCH_SCAN entries;
+        keep passing next_cursor while has_more is set.
+        """
+        count = self._page_size(count, fields)
+        tokens = self._search_tokens(query, MAX_RECORD_TOKENS)
+        if not tokens:
+            raise gl.vm.UserError("The query has no searchable words")
+
+        result = {"records": [], "tokens": tokens, "returned_count": 0, "has_more": False,
+                  "next_cursor": cursor}
+        if fields == "slim":
+            result["columns"] = SLIM_COLUMNS
+
+        indexes = self._indexes()
+        postings = []
+        for token in tokens:
+            if token not in indexes.by_token:
+                return result
+            postings.append(indexes.by_token[token])
+        if category:
+            if category not in CATEGORIES:
+                return result
+            postings.append(indexes.by_category[category])
+
+        sizes = [posting.size for posting in postings]
+        shortest = sizes.index(min(sizes))
+        driver = postings[shortest]
+        filters = postings[:shortest] + postings[shortest + 1:]
+
+        after = self._decode_cursor(cursor)
+        offset = driver.offset_after(after[0], after[1]) if after else 0
+        scanned = 0
+        for score, entry in driver.iter_from(offset):
+            if scanned == MAX_SEARCH_SCAN or len(result["records"]) == count:
+                break
+            scanned += 1
+            # The cursor follows the scan, not the matches, so a partial page resumes where it stopped
+            result["next_cursor"] = self._encode_cursor(score, entry.seq)
+            if all(posting.rank_of(score, entry.seq) for posting in filters):
+                record = self.analyses_by_id[entry.id]
+                found_category, _ = self._placement(record)
+                rank = self._get_category_index(found_category).rank_of(score, entry.seq)
+                result["records"].append(self._record_row(record, rank, fields, True))
+
+        result["returned_count"] = len(result["records"])
+        result["has_more"] = offset + scanned < min(sizes)
+        return result
 
     @gl.public.view
     def get_analysis_by_id(self, id: str) -> dict:
-        """Get a single analysis record by its ID, searching all categories"""
+        """Get a single analysis record by its ID, with its category and rank"""
         # Look up the record in the ID map
         if id not in self.analyses_by_id:
             return {}
 
         record = self.analyses_by_id[id]
 
-        # Find which category this record belongs to and its rank
-        found_category = None
-        rank = None
+        # Category is stored with the record, rank comes from the category index
+        return self._record_row(record, self._record_rank(record), "full", True)
 
-        for category in CATEGORIES.keys():
-            category_array = self._get_category_array(category)
-            for i in range(len(category_array)):
-                if category_array[i].id == id:
-                    found_category = category
-                    rank = i + 1
-                    break
-            if found_category:
-                break
+    @gl.public.view
+    def get_submission_status(self, id: str) -> dict:
+        """Cheap poll target for the waiting page: status, score and category only.
+
+        Reads a handful of fields of one record, no index or consensus_output.
+        Ids without a record yet report STATUS_PENDING with found=False.
+        """
+        if id not in self.analyses_by_id:
+            return {"id": id, "found": False, "status": STATUS_PENDING, "score": 0, "category": ""}
 
-        # Return the record details with category
+        record = self.analyses_by_id[id]
+        category, score = self._placement(record)
         return {
-            "id": record.id,
-            "category": found_category if found_category else "easter_eggs",
-            "consensus_output": record.consensus_output,
-            "caller_address": record.caller_address.as_hex,
-            "defense": record.defense,
-            "original_url": record.original_url,
-            "leaderboard_url": record.leaderboard_url,
-            "analysis_url": record.analysis_url,
-            "name": record.name,
-            "location": record.location,
-            "score": record.score,
-            "rank": rank if rank is not None else 0
+            "id": id,
+            "found": True,
+            "status": record.status,
+            "score": score,
+            "category": category
         }
 
     @gl.public.view
-    def get_analysis_by_wallet(self, wallet_address: str, start_index: int = 0, count: int = 10) -> dict:
-        """Get analyses for a given wallet address with pagination, sorted by score"""
-        # Validate parameters
-        if start_index < 0:
-            start_index = 0
-        if count <= 0:
-            count = 10
-        if count > 10:
-            count = 10  # Enforce maximum 10 items per request
+    def get_analyses_by_ids(self, ids: list, fields: str = "full") -> dict:
+        """Get many records by ID in one call, in request order.
 
-        # Collect all records from all categories for the specified wallet
-        all_records = []
-
-        for category in CATEGORIES.keys():
-            category_array = self._get_category_array(category)
-            for record in category_array:
-                if record.caller_address.as_hex == wallet_address:
-                    all_records.append(record)
+        Accepts at most one page worth of ids for the projection (MAX_PAGE_SIZE
+        full, MAX_SLIM_PAGE_SIZE slim). Unknown ids come back as None in their
+        position and are also listed under "missing".
+        """
+        max_count = MAX_SLIM_PAGE_SIZE if fields == "slim" else MAX_PAGE_SIZE
+        if len(ids) > max_count:
+            raise gl.vm.UserError(f"At most {max_count} ids per request")
 
-        # Sort by score descending (highest first)
-        all_records.sort(key=lambda x: x.score, reverse=True)
+        records = []
+        missing = []
+        for record_id in ids:
+            if record_id not in self.analyses_by_id:
+                records.append(None)
+                missing.append(record_id)
+                continue
 
-        total_count = len(all_records)
-        end_index = min(start_index + count, total_count)
+            record = self.analyses_by_id[record_id]
+            records.append(self._record_row(record, self._record_rank(record), fields, True))
 
-        # Convert requested slice to list of dicts
-        records = []
-        for i in range(start_index, end_index):
-            record = all_records[i]
-            rank = i + 1  # Global rank (1-indexed, position in sorted array)
-
-            # Find which category this record belongs to
-            found_category = "easter_eggs"
-            for category in CATEGORIES.keys():
-                category_array = self._get_category_array(category)
-                for cat_record in category_array:
-                    if cat_record.id == record.id:
-                        found_category = category
-                        break
-                if found_category != "easter_eggs":
-                    break
+        result = {
+            "records": records,
+            "missing": missing,
+            "returned_count": len(records) - len(missing)
+        }
+        if fields == "slim":
+            result["columns"] = SLIM_COLUMNS
+        return result
 
-            records.append({
-                "id": record.id,
-                "category": found_category,
-                "consensus_output": record.consensus_output,
-                "caller_address": record.caller_address.as_hex,
-                "defense": record.defense,
-                "original_url": record.original_url,
-                "leaderboard_url": record.leaderboard_url,
-                "analysis_url": record.analysis_url,
-                "name": record.name,
-                "location": record.location,
-                "score": record.score,
-                "rank": rank
+    @gl.public.view
+    def get_changes_since(self, seq: int = 0, limit: int = MAX_CHANGES_PAGE) -> dict:
+        """Page through the change feed: events with a sequence number above seq, oldest first.
+
+        Every stored submission, failed or scored, and every successful retry
+        appends one event. Keep the returned next_seq and pass it back to pull
+        only newer changes. Costs O(limit) reads.
+        """
+        if seq < 0:
+            seq = 0
+        if limit <= 0 or limit > MAX_CHANGES_PAGE:
+            limit = MAX_CHANGES_PAGE
+
+        latest_seq = len(self.changes)
+        end = min(seq + limit, latest_seq)
+
+        events = []
+        for position in range(seq, end):
+            event = self.changes[position]
+            events.append({
+                "seq": position + 1,
+                "id": event.id,
+                "category": event.category,
+                "score": event.score,
+                "wallet": event.wallet.as_hex,
+                "status": event.status
             })
 
         return {
-            "records": records,
-            "total_count": total_count,
-            "start_index": start_index,
-            "returned_count": len(records),
-            "has_more": end_index < total_count
+            "events": events,
+            "next_seq": max(seq, end),
+            "latest_seq": latest_seq,
+            "has_more": end < latest_seq
+        }
+
+    @gl.public.view
+    def get_migration_status(self) -> dict:
+        """Progress of the running migration, or the totals of the last one when idle"""
+        migration = self.migration
+        return {
+            "phase": migration.phase,
+            "active_generation": self.active_generation,
+            "target_generation": migration.target,
+            "processed_events": migration.cursor,
+            "total_events": len(self.changes),
+            "indexed": migration.indexed,
+            "moved": migration.moved,
+            "rewritten": migration.rewritten
+        }
+
+    @gl.public.view
+    def get_stats(self, wallet_address: str = "") -> dict:
+        """Headline numbers from the incrementally maintained aggregates.
+
+        Returns count, score sum, average, max and a HISTOGRAM_BUCKET_WIDTH-point
+        histogram per category and overall, plus the number of distinct wallets.
+        Pass wallet_address to also get that wallet's totals. Costs O(categories)
+        storage reads whatever the number of submissions.
+        """
+        categories = {}
+        overall = self._stats_dict(None)
+        for category in CATEGORIES.keys():
+            stats = self._stats_dict(self._indexes().category_stats.get(category))
+            categories[category] = stats
+
+            overall["count"] += stats["count"]
+            overall["score_sum"] += stats["score_sum"]
+            overall["max_score"] = max(overall["max_score"], stats["max_score"])
+            for i in range(HISTOGRAM_BUCKETS):
+                overall["histogram"][i] += stats["histogram"][i]
+        if overall["count"]:
+            overall["average_score"] = overall["score_sum"] // overall["count"]
+
+        result = {
+            "total": overall,
+            "categories": categories,
+            "unique_wallets": self._indexes().unique_wallets,
+            "histogram_bucket_width": HISTOGRAM_BUCKET_WIDTH
         }
+
+        if wallet_address:
+            try:
+                wallet = Address(wallet_address)
+            except (ValueError, TypeError):
+                wallet = None
+            result["wallet"] = self._stats_dict(
+                self._indexes().wallet_stats.get(wallet) if wallet is not None else None)
+
+        return result
+
+    @gl.public.view
+    def get_analysis_by_wallet(self, wallet_address: str, start_index: int = 0, count: int = 10,
+                               fields: str = "full", cursor: str = "") -> dict:
+        """Get analyses for a given wallet address with pagination, sorted by score.
+
+        Accepts the same fields projection and cursor as get_analysis_by_category.
+        """
+        # Validate parameters
+        count = self._page_size(count, fields)
+
+        # Match on raw address bytes, so hex casing/checksumming doesn't matter
+        try:
+            wallet = Address(wallet_address)
+        except (ValueError, TypeError):
+            wallet = None
+
+        wallets = self._indexes().by_wallet
+        if wallet is None or wallet not in wallets:
+            return self._page_result([], 0, max(start_index, 0), fields, cursor)
+
+        # The wallet index is already sorted by score, seek straight to the requested page
+        wallet_index = wallets[wallet]
+        start_index = self._page_offset(wallet_index, start_index, cursor)
+        entries = wallet_index.slice(start_index, count)
+
+        # Convert requested slice to rows
+        records = []
+        next_cursor = cursor
+        for i, (score, entry) in enumerate(entries):
+            record = self.analyses_by_id[entry.id]
+            rank = start_index + i + 1  # Position among this wallet's submissions (1-indexed)
+            records.append(self._record_row(record, rank, fields, True))
+            next_cursor = self._encode_cursor(score, entry.seq)
+
+        return self._page_result(records, wallet_index.size, start_index, fields, next_cursor)
@@ -0,0 +1,112 @@
+"""Benchmark the contract's hot paths offline at several leaderboard sizes.
+
+    python contracts/sim/bench.py                       # 1k, 100k and 1M records
+    python contracts/sim/bench.py --sizes 1000,20000 --calls 50 --json
+
+For each size a fresh contract is seeded with that many scored submissions,
+then every scenario runs --calls times. Reports wall time per call and the
+storage reads/writes per call as counted by the stand-in SDK (see
+genlayer.py for the accounting model). Timings include the metering overhead,
+so compare them between runs of this script, not with a live node. Seeding 1M
+records takes a few minutes and about 2 GB of memory.
+"""
+
+import argparse
+import json
+import random
+import statistics
+import time
+
+from harness import deploy, load_contract, meter, seed, submit, wallet
+
+DEFAULT_SIZES = [1_000, 100_000, 1_000_000]
+
+
+def measure(calls: int, fn) -> dict:
+    """Run fn(i) calls times, collecting wall time and storage accesses per call"""
+    times, reads, writes = [], [], []
+    for i in range(calls):
+        meter.reset()
+        started = time.perf_counter()
+        fn(i)
+        times.append((time.perf_counter() - started) * 1000)
+        reads.append(meter.reads)
+        writes.append(meter.writes)
+    times.sort()
+    return {
+        "calls": calls,
+        "ms_mean": statistics.fmean(times),
+        "ms_p95": times[min(len(times) - 1, int(len(times) * 0.95))],
+        "reads": statistics.fmean(reads),
+        "reads_max": max(reads),
+        "writes": statistics.fmean(writes),
+    }
+
+
+def scenarios(contract, ids: list[str], wallets: int, rng: random.Random, size: int) -> dict:
+    """Scenario name -> per-call function, run in this order"""
+    category = "steak"
+    category_size = contract._get_category_index(category).size
+    first_page = contract.get_analysis_by_category(category, 0, 10)
+
+    return {
+        "analyze_image": lambda i: submit(contract, f"bench-{size}-{i}", defense="asado en Palermo"),
+        # Same image and defense as the previous scenario's calls, served from the verdict cache
+        "analyze_image (cached verdict)": lambda i: submit(contract, f"bench-{size}-{i}-again",
+                                                           defense="asado en Palermo", image=f"bench-{size}-{i}"),
+        "get_analysis_by_category (first page)": lambda i: contract.get_analysis_by_category(category, 0, 10),
+        "get_analysis_by_category (middle offset)": lambda i: contract.get_analysis_by_category(
+            category, category_size // 2, 10),
+        "get_analysis_by_category (cursor)": lambda i: contract.get_analysis_by_category(
+            category, 0, 10, cursor=first_page["next_cursor"]),
+        "get_analysis_by_category (slim, 50)": lambda i: contract.get_analysis_by_category(
+            category, 0, 50, fields="slim"),
+        "get_leaderboard_window (week)": lambda i: contract.get_leaderboard_window(category, "week"),
+        "get_analysis_by_id": lambda i: contract.get_analysis_by_id(rng.choice(ids)),
+        "get_analysis_by_wallet": lambda i: contract.get_analysis_by_wallet(
+            wallet(rng.randint(1, wallets)).as_hex, 0, 10),
+    }
+
+
+def run(sizes: list[int], calls: int, seed_value: int):
+    """Yield one result row per (size, scenario)"""
+    module = load_contract()
+    for size in sizes:
+        rng = random.Random(seed_value)
+        contract = deploy(module)
+        wallets = max(1, size // 10)
+        started = time.perf_counter()
+        ids = seed(module, contract, size, wallets, rng)
+        seed_seconds = time.perf_counter() - started
+
+        for name, fn in scenarios(contract, ids, wallets, rng, size).items():
+            row = measure(calls, fn)
+            row.update(size=size, scenario=name, seed_seconds=seed_seconds)
+            yield row
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--sizes", default=",".join(str(size) for size in DEFAULT_SIZES),
+                        help="comma separated record counts to seed (default: %(default)s)")
+    parser.add_argument("--calls", type=int, default=100, help="calls per scenario (default: %(default)s)")
+    parser.add_argument("--seed", type=int, default=0, help="random seed (default: %(default)s)")
+    parser.add_argument("--json", action="store_true", help="print one JSON object per scenario")
+    args = parser.parse_args()
+    sizes = [int(size) for size in args.sizes.split(",") if size]
+
+    current_size = None
+    for row in run(sizes, args.calls, args.seed):
+        if args.json:
+            print(json.dumps(row), flush=True)
+            continue
+        if row["size"] != current_size:
+            current_size = row["size"]
+            print(f"\n{current_size:,} records (seeded in {row['seed_seconds']:.1f}s)")
+            print(f"  {'scenario':<42} {'ms/call':>9} {'p95 ms':>9} {'reads':>9} {'max':>7} {'writes':>8}")
+        print(f"  {row['scenario']:<42} {row['ms_mean']:>9.3f} {row['ms_p95']:>9.3f} "
+              f"{row['reads']:>9.1f} {row['reads_max']:>7} {row['writes']:>8.1f}", flush=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,160 @@
+"""Per-method storage and web/LLM cost profile of the contract under a production-like workload.
+
+    python contracts/sim/costs.py                     # 1k and 10k records
+    python contracts/sim/costs.py --sizes 1000,100000 --fields all --json
+
+The same mixed workload (single, cached, failed, retried, batched and imported
+submissions, every read method, then a full index migration) runs against a contract seeded at each
+size. For every public method the profile shows mean storage reads, writes and
+bytes per call, the web renders, LLM prompts and consensus rounds it made, and
+the reads spent under each contract field. The growth column compares mean
+reads at the largest size with the smallest: a path whose cost follows the
+number of stored records shows up there long before it shows up on chain.
+"""
+
+import argparse
+import json
+import random
+
+from harness import act_as, deploy, image_url, load_contract, profiler, seed, sim, submit, wallet
+
+DEFAULT_SIZES = [1_000, 10_000]
+DEFAULT_FIELDS = ["indexes", "analyses_by_id"]
+# Reads growing by more than this factor between the smallest and largest size are flagged
+GROWTH_WARNING = 2.0
+
+
+def workload(module, contract, ids: list[str], wallets: int, rng: random.Random) -> None:
+    """Exercise every public method the way the frontend does"""
+    act_as(wallet(1))
+    for i in range(20):
+        submit(contract, f"new-{i}", defense="asado en Palermo")
+    for i in range(10):
+        submit(contract, f"again-{i}", defense="asado en Palermo", image=f"new-{i}")
+
+    for i in range(5):
+        sim.unreachable.add(image_url(f"broken-{i}"))
+        submit(contract, f"broken-{i}")
+    sim.unreachable.clear()
+    for i in range(5):
+        contract.retry_analysis(f"broken-{i}")
+
+    for b in range(5):
+        contract.analyze_images([
+            {"id": f"batch-{b}-{i}", "original_url": image_url(f"batch-{b}-{i}"),
+             "leaderboard_url": image_url(f"batch-{b}-{i}"), "analysis_url": image_url(f"batch-{b}-{i}"),
+             "defense": "", "name": "batch", "location": "Rosario"}
+            for i in range(4)
+        ])
+
+    act_as(wallet(0))
+    for b in range(2):
+        contract.import_legacy_records([
+            {"category": rng.choice(list(module.CATEGORIES)), "id": f"legacy-{b}-{i}",
+             "consensus_output": json.dumps({"score": 500}), "caller_address": wallet(2).as_hex,
+             "score": rng.randint(0, 1000)}
+            for i in range(5)
+        ])
+
+    for category in module.CATEGORIES:
+        first_page = contract.get_analysis_by_category(category, 0, 10)
+        contract.get_analysis_by_category(category, 0, 10, cursor=first_page["next_cursor"])
+        contract.get_analysis_by_category(category, first_page["total_count"] // 2, 50, fields="slim")
+
+        contract.get_leaderboard_window(category, "day")
+        contract.get_leaderboard_window(category, "week", "", 10, "full", 1)
+
+    cursor = ""
+    for _ in range(5):
+        page = contract.get_global_leaderboard(cursor, 10)
+        cursor = page["next_cursor"]
+
+    for _ in range(20):
+        record_id = rng.choice(ids)
+        contract.get_analysis_by_id(record_id)
+        contract.get_submission_status(record_id)
+    for _ in range(10):
+        contract.get_analyses_by_ids(rng.sample(ids, 10))
+        contract.get_analysis_by_wallet(wallet(rng.randint(1, wallets)).as_hex, 0, 10)
+    for query, category in [("mendoza", ""), ("bife de chorizo", "steak"), ("mate cordoba", ""),
+                            ("batch rosario", "")]:
+        contract.search_analyses(query, category)
+    for _ in range(5):
+        contract.get_stats(wallet(rng.randint(1, wallets)).as_hex)
+        contract.get_changes_since(rng.randint(0, len(ids)), 100)
+
+    # Full re-index; the imported records above re-derive a different score and get written back
+    contract.start_migration()
+    while contract.get_migration_status()["phase"] != module.MIGRATION_IDLE:
+        contract.migrate()
+
+
+def run(sizes: list[int], seed_value: int) -> dict:
+    """Size -> profiler summary of the workload at that size"""
+    module = load_contract()
+    profiles = {}
+    for size in sizes:
+        rng = random.Random(seed_value)
+        contract = deploy(module)
+        wallets = max(1, size // 10)
+        ids = seed(module, contract, size, wallets, rng)
+
+        profiler.reset()
+        profiler.enabled = True
+        try:
+            workload(module, contract, ids, wallets, rng)
+        finally:
+            profiler.enabled = False
+        profiles[size] = profiler.summary()
+    return profiles
+
+
+def print_report(profiles: dict, fields: list[str]) -> None:
+    sizes = sorted(profiles)
+    smallest, largest = profiles[sizes[0]], profiles[sizes[-1]]
+    for size in sizes:
+        print(f"\n{size:,} records")
+        print(f"  {'method':<26} {'calls':>5} {'reads':>8} {'max':>6} {'writes':>7} {'read B':>8} "
+              f"{'write B':>8} {'web':>4} {'llm':>4} {'rounds':>6} {'growth':>7}")
+        for name, cost in profiles[size].items():
+            growth = ""
+            if size == sizes[-1] and len(sizes) > 1 and name in smallest:
+                ratio = cost["reads"] / max(smallest[name]["reads"], 1)
+                growth = f"x{ratio:.1f}" + (" !" if ratio > GROWTH_WARNING else "")
+            calls_out = cost["calls_out"]
+            print(f"  {name:<26} {cost['calls']:>5} {cost['reads']:>8.1f} {cost['max_reads']:>6} "
+                  f"{cost['writes']:>7.1f} {cost['read_bytes']:>8.0f} {cost['write_bytes']:>8.0f} "
+                  f"{calls_out['web_render']:>4.1f} {calls_out['llm_prompt']:>4.1f} "
+                  f"{calls_out['consensus_round']:>6.1f} {growth:>7}")
+            for root, counts in cost["fields"].items():
+                if "all" in fields or root in fields:
+                    print(f"      {root:<22} {'':>5} {counts['reads']:>8.1f} {'':>6} {counts['writes']:>7.1f} "
+                          f"{counts['read_bytes']:>8.0f} {counts['write_bytes']:>8.0f}")
+
+    flagged = [name for name, cost in largest.items() if len(sizes) > 1 and name in smallest
+               and cost["reads"] / max(smallest[name]["reads"], 1) > GROWTH_WARNING]
+    if flagged:
+        print(f"\nReads growing more than x{GROWTH_WARNING:g} from {sizes[0]:,} to {sizes[-1]:,} records: "
+              + ", ".join(flagged))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--sizes", default=",".join(str(size) for size in DEFAULT_SIZES),
+                        help="comma separated record counts to seed (default: %(default)s)")
+    parser.add_argument("--fields", default=",".join(DEFAULT_FIELDS),
+                        help="contract fields to break costs down by, or 'all' (default: %(default)s)")
+    parser.add_argument("--seed", type=int, default=0, help="random seed (default: %(default)s)")
+    parser.add_argument("--json", action="store_true", help="print the profiles as JSON")
+    args = parser.parse_args()
+    sizes = [int(size) for size in args.sizes.split(",") if size]
+
+    profiles = run(sizes, args.seed)
+    if args.json:
+        print(json.dumps(profiles, indent=2))
+    else:
+        print_report(profiles, args.fields.split(","))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,567 @@
+"""In-memory stand-in for the `genlayer` SDK, enough to run the contracts offline.
+
+Storage types behave like their on-chain counterparts and report every slot
+access to `meter`, attributed to the contract field it happened under (an
+`AnalysisRecord` read through `analyses_by_id` counts for `analyses_by_id`).
+Only values that live in contract storage are metered: dataclasses and
+containers count once they are reachable from a contract field, so building a
+record in memory before storing it is free, like on chain.
+
+Accounting model (logical slot accesses, not gas):
+- reading a scalar field (str, int, bytes, Address) of stored data: 1 read
+- writing a value: 1 write per scalar it holds
+- TreeMap key probe (`[]`, `in`, `get`, `get_or_insert_default`): 1 read
+- TreeMap insert, or a DynArray append: 1 write for the key/length, plus the value
+- reading a DynArray element: 1 read for scalars, dataclass elements are read
+  field by field
+- `len()` of a container: 1 read, iterating a TreeMap: 1 read per key
+- bytes: UTF-8 length of strings, 20 per Address, 8 per integer, of every
+  scalar value or key read or written
+
+Nondeterministic calls (`gl.nondet.*`, `gl.eq_principle.*`, `gl.vm.run_nondet`)
+are answered by `sim`, with seeded random or fixed verdicts, and counted in
+`meter.calls`. A `run_nondet` round also runs its validator once, unmetered,
+and raises ConsensusError if the validator disagrees.
+
+With `profiler.enabled`, every top-level `@gl.public` call records the
+storage accesses, bytes and web/LLM calls it caused; see costs.py.
+"""
+
+import dataclasses
+import functools
+import json
+import random
+import re
+import time
+import typing
+
+u32 = int
+u64 = int
+i64 = int
+bigint = int
+
+
+class StorageMeter:
+    """Counts storage slot reads/writes and bytes, per contract field, while enabled"""
+
+    def __init__(self):
+        self.enabled = True
+        self.reset()
+
+    def reset(self) -> None:
+        self.reads = 0
+        self.writes = 0
+        self.read_bytes = 0
+        self.write_bytes = 0
+        # Contract field -> [reads, writes, read bytes, written bytes]
+        self.fields = {}
+        # Nondeterministic calls: web renders, LLM prompts and consensus rounds
+        self.calls = {"web_render": 0, "llm_prompt": 0, "consensus_round": 0}
+
+    def _field(self, root: str) -> list:
+        if root not in self.fields:
+            self.fields[root] = [0, 0, 0, 0]
+        return self.fields[root]
+
+    def read(self, root: str, value) -> None:
+        size = _byte_size(value)
+        self.reads += 1
+        self.read_bytes += size
+        field = self._field(root)
+        field[0] += 1
+        field[2] += size
+
+    def write(self, root: str, value, key=None) -> None:
+        """Writes of a value, plus one slot for the key or length it goes under"""
+        slots, size = _footprint(value)
+        if key is not None:
+            slots += 1
+            size += _byte_size(key)
+        self.writes += slots
+        self.write_bytes += size
+        field = self._field(root)
+        field[1] += slots
+        field[3] += size
+
+    def snapshot(self) -> dict:
+        return {
+            "reads": self.reads,
+            "writes": self.writes,
+            "read_bytes": self.read_bytes,
+            "write_bytes": self.write_bytes,
+            "fields": {root: list(counts) for root, counts in self.fields.items()},
+            "calls": dict(self.calls),
+        }
+
+
+meter = StorageMeter()
+
+
+class Address:
+    def __init__(self, value):
+        if isinstance(value, Address):
+            value = value.as_bytes
+        elif isinstance(value, str):
+            value = bytes.fromhex(value[2:] if value.startswith("0x") else value)
+        if len(value) != 20:
+            raise ValueError(f"Address must be 20 bytes, got {len(value)}")
+        self._bytes = bytes(value)
+
+    @property
+    def as_bytes(self) -> bytes:
+        return self._bytes
+
+    @property
+    def as_hex(self) -> str:
+        return "0x" + self._bytes.hex()
+
+    def __eq__(self, other):
+        return isinstance(other, Address) and other._bytes == self._bytes
+
+    def __lt__(self, other):
+        return self._bytes < other._bytes
+
+    def __hash__(self):
+        return hash(self._bytes)
+
+    def __repr__(self):
+        return f"Address({self.as_hex})"
+
+
+SCALARS = (str, int, float, bool, bytes, Address, type(None))
+
+
+def _root(value):
+    """Contract field a stored value lives under, None if it isn't stored"""
+    return getattr(value, "_sim_root", None)
+
+
+def _byte_size(value) -> int:
+    if isinstance(value, str):
+        return len(value.encode())
+    if isinstance(value, bytes):
+        return len(value)
+    if isinstance(value, Address):
+        return 20
+    if isinstance(value, bool) or value is None:
+        return 1
+    return 8
+
+
+def _footprint(value) -> tuple[int, int]:
+    """(slots, bytes) a value occupies"""
+    if isinstance(value, SCALARS):
+        return 1, _byte_size(value)
+    if isinstance(value, TreeMap):
+        parts = [(1, _byte_size(key)) for key in dict.keys(value)]
+        parts += [_footprint(item) for item in dict.values(value)]
+    elif isinstance(value, DynArray):
+        parts = [(1, 8)] + [_footprint(item) for item in list.__iter__(value)]
+    elif dataclasses.is_dataclass(value):
+        parts = [_footprint(object.__getattribute__(value, f.name)) for f in dataclasses.fields(value)]
+    else:
+        return 1, 8
+    return sum(slots for slots, _ in parts), sum(size for _, size in parts)
+
+
+def _mark_stored(value, root: str) -> None:
+    """Flag a value, and everything it holds, as living in contract storage under root"""
+    if isinstance(value, SCALARS) or _root(value) is not None:
+        return
+    object.__setattr__(value, "_sim_root", root)
+    if isinstance(value, TreeMap):
+        for item in dict.values(value):
+            _mark_stored(item, root)
+    elif isinstance(value, DynArray):
+        for item in list.__iter__(value):
+            _mark_stored(item, root)
+    elif dataclasses.is_dataclass(value):
+        for f in dataclasses.fields(value):
+            _mark_stored(object.__getattribute__(value, f.name), root)
+
+
+def _default(t):
+    """Zero value of a storage type, what an unset slot reads as"""
+    if isinstance(t, type) and issubclass(t, (TreeMap, DynArray)):
+        return t()
+    if dataclasses.is_dataclass(t):
+        hints = typing.get_type_hints(t)
+        return t(**{f.name: _default(hints[f.name]) for f in dataclasses.fields(t)})
+    if t is str:
+        return ""
+    if t is bool:
+        return False
+    if t is int:
+        return 0
+    if t is Address:
+        return Address(bytes(20))
+    return None
+
+
+class TreeMap(dict):
+    """Sorted-key storage map"""
+    _value_type = None
+    _specialized = {}
+
+    def __class_getitem__(cls, item):
+        if item not in TreeMap._specialized:
+            TreeMap._specialized[item] = type("TreeMap", (TreeMap,), {"_value_type": item[1]})
+        return TreeMap._specialized[item]
+
+    def _metered(self) -> bool:
+        return meter.enabled and _root(self) is not None
+
+    def __getitem__(self, key):
+        if self._metered():
+            meter.read(self._sim_root, key)
+        return dict.__getitem__(self, key)
+
+    def __contains__(self, key):
+        if self._metered():
+            meter.read(self._sim_root, key)
+        return dict.__contains__(self, key)
+
+    def get(self, key, default=None):
+        if self._metered():
+            meter.read(self._sim_root, key)
+        return dict.get(self, key, default)
+
+    def get_or_insert_default(self, key):
+        if self._metered():
+            meter.read(self._sim_root, key)
+        if not dict.__contains__(self, key):
+            value = _default(self._value_type)
+            root = _root(self)
+            if root is not None:
+                if meter.enabled:
+                    meter.write(root, value, key)
+                _mark_stored(value, root)
+            dict.__setitem__(self, key, value)
+        return dict.__getitem__(self, key)
+
+    def __setitem__(self, key, value):
+        root = _root(self)
+        if root is not None:
+            if meter.enabled:
+                meter.write(root, value, key)
+            _mark_stored(value, root)
+        dict.__setitem__(self, key, value)
+
+    def __delitem__(self, key):
+        if self._metered():
+            meter.write(self._sim_root, key)
+        dict.__delitem__(self, key)
+
+    def __len__(self):
+        if self._metered():
+            meter.read(self._sim_root, 0)
+        return dict.__len__(self)
+
+    def __iter__(self):
+        for key in sorted(dict.keys(self)):
+            if self._metered():
+                meter.read(self._sim_root, key)
+            yield key
+
+    def keys(self):
+        return list(self.__iter__())
+
+    def items(self):
+        return [(key, dict.__getitem__(self, key)) for key in self.__iter__()]
+
+    def values(self):
+        return [dict.__getitem__(self, key) for key in self.__iter__()]
+
+
+class DynArray(list):
+    """Growable storage array"""
+    _specialized = {}
+
+    def __class_getitem__(cls, item):
+        if item not in DynArray._specialized:
+            DynArray._specialized[item] = type("DynArray", (DynArray,), {})
+        return DynArray._specialized[item]
+
+    def _metered(self) -> bool:
+        return meter.enabled and _root(self) is not None
+
+    def __getitem__(self, index):
+        value = list.__getitem__(self, index)
+        if self._metered():
+            for item in (value if isinstance(index, slice) else [value]):
+                if isinstance(item, SCALARS):
+                    meter.read(self._sim_root, item)
+        return value
+
+    def __iter__(self):
+        for index in range(list.__len__(self)):
+            yield self[index]
+
+    def __len__(self):
+        if self._metered():
+            meter.read(self._sim_root, 0)
+        return list.__len__(self)
+
+    def __setitem__(self, index, value):
+        root = _root(self)
+        if root is not None:
+            if meter.enabled:
+                meter.write(root, value)
+            _mark_stored(value, root)
+        list.__setitem__(self, index, value)
+
+    def append(self, value):
+        root = _root(self)
+        if root is not None:
+            if meter.enabled:
+                meter.write(root, value, list.__len__(self))
+            _mark_stored(value, root)
+        list.append(self, value)
+
+
+def allow_storage(cls):
+    """Meter field access on stored instances of a storage dataclass"""
+    names = frozenset(f.name for f in dataclasses.fields(cls))
+
+    def __getattribute__(self, name):
+        value = object.__getattribute__(self, name)
+        if name in names and meter.enabled and isinstance(value, SCALARS):
+            root = object.__getattribute__(self, "_sim_root")
+            if root is not None:
+                meter.read(root, value)
+        return value
+
+    def __setattr__(self, name, value):
+        if name in names:
+            root = object.__getattribute__(self, "_sim_root")
+            if root is not None:
+                if meter.enabled:
+                    meter.write(root, value)
+                _mark_stored(value, root)
+        object.__setattr__(self, name, value)
+
+    cls._sim_root = None
+    cls.__getattribute__ = __getattribute__
+    cls.__setattr__ = __setattr__
+    return cls
+
+
+class Contract:
+    """Base contract: annotated class attributes are storage fields"""
+
+    def __new__(cls, *args, **kwargs):
+        contract = object.__new__(cls)
+        hints = typing.get_type_hints(cls)
+        object.__setattr__(contract, "_sim_fields", frozenset(hints))
+        for name, t in hints.items():
+            value = _default(t)
+            _mark_stored(value, name)
+            object.__setattr__(contract, name, value)
+        return contract
+
+    def __getattribute__(self, name):
+        value = object.__getattribute__(self, name)
+        if meter.enabled and isinstance(value, SCALARS) and not name.startswith("_") \
+                and name in object.__getattribute__(self, "_sim_fields"):
+            meter.read(name, value)
+        return value
+
+    def __setattr__(self, name, value):
+        if name in object.__getattribute__(self, "_sim_fields"):
+            if meter.enabled:
+                meter.write(name, value)
+            _mark_stored(value, name)
+        object.__setattr__(self, name, value)
+
+
+class Profiler:
+    """Records what each top-level public method call cost, while enabled"""
+
+    def __init__(self):
+        self.enabled = False
+        self.depth = 0
+        # Method name -> list of per-call cost dicts (see StorageMeter.snapshot, plus ms)
+        self.invocations = {}
+
+    def reset(self) -> None:
+        self.invocations = {}
+
+    def call(self, fn, contract, args, kwargs):
+        if not self.enabled or self.depth:
+            return fn(contract, *args, **kwargs)
+        before = meter.snapshot()
+        started = time.perf_counter()
+        self.depth += 1
+        try:
+            return fn(contract, *args, **kwargs)
+        finally:
+            self.depth -= 1
+            elapsed = (time.perf_counter() - started) * 1000
+            self.invocations.setdefault(fn.__name__, []).append(_cost(before, meter.snapshot(), elapsed))
+
+    def summary(self) -> dict:
+        """Method name -> mean cost per call, with the worst call's reads and writes"""
+        result = {}
+        for name, calls in sorted(self.invocations.items()):
+            fields = {}
+            for call in calls:
+                for root, counts in call["fields"].items():
+                    totals = fields.setdefault(root, [0, 0, 0, 0])
+                    for i, count in enumerate(counts):
+                        totals[i] += count
+            result[name] = {
+                "calls": len(calls),
+                "ms": sum(call["ms"] for call in calls) / len(calls),
+                "reads": sum(call["reads"] for call in calls) / len(calls),
+                "writes": sum(call["writes"] for call in calls) / len(calls),
+                "read_bytes": sum(call["read_bytes"] for call in calls) / len(calls),
+                "write_bytes": sum(call["write_bytes"] for call in calls) / len(calls),
+                "max_reads": max(call["reads"] for call in calls),
+                "max_writes": max(call["writes"] for call in calls),
+                "fields": {root: dict(zip(("reads", "writes", "read_bytes", "write_bytes"),
+                                          (count / len(calls) for count in totals)))
+                           for root, totals in sorted(fields.items())},
+                "calls_out": {kind: sum(call["calls"][kind] for call in calls) / len(calls)
+                              for kind in meter.calls},
+            }
+        return result
+
+
+def _cost(before: dict, after: dict, ms: float) -> dict:
+    fields = {}
+    for root, counts in after["fields"].items():
+        previous = before["fields"].get(root, [0, 0, 0, 0])
+        delta = [count - old for count, old in zip(counts, previous)]
+        if any(delta):
+            fields[root] = delta
+    return {
+        "ms": ms,
+        "reads": after["reads"] - before["reads"],
+        "writes": after["writes"] - before["writes"],
+        "read_bytes": after["read_bytes"] - before["read_bytes"],
+        "write_bytes": after["write_bytes"] - before["write_bytes"],
+        "fields": fields,
+        "calls": {kind: after["calls"][kind] - before["calls"][kind] for kind in after["calls"]},
+    }
+
+
+profiler = Profiler()
+
+
+def _public(fn):
+    @functools.wraps(fn)
+    def method(self, *args, **kwargs):
+        return profiler.call(fn, self, args, kwargs)
+    return method
+
+
+class UserError(Exception):
+    pass
+
+
+class ConsensusError(Exception):
+    """The validator of a run_nondet round rejected the leader's result"""
+
+
+class Return:
+    """A leader's successful result, as handed to a run_nondet validator"""
+
+    def __init__(self, calldata):
+        self.calldata = calldata
+
+
+class Simulation:
+    """Answers the contract's web and LLM calls.
+
+    Stage-1 analyses name a random category and the jury gives a random score,
+    both from a seeded generator. Set `verdict` to a {category, score,
+    reasoning} dict to pin them, and add URLs to `unreachable` to make their
+    render fail. Validator prompts are answered with `validator_answer`.
+    """
+
+    def __init__(self, seed: int = 0):
+        self.rng = random.Random(seed)
+        self.verdict = None
+        self.unreachable = set()
+        self.validator_answer = "true"
+        self.categories = ["steak", "veggies", "mate", "gaucho", "futbol", "easter_eggs"]
+
+    def render(self, url: str, mode: str = "text") -> bytes:
+        meter.calls["web_render"] += 1
+        if url in self.unreachable:
+            raise ConnectionError(f"render failed for {url}")
+        return b"sim-image:" + url.encode()
+
+    def exec_prompt(self, prompt: str, images=None) -> str:
+        """Image prompts get a stage-1 analysis, validator prompts `validator_answer`, jury prompts a verdict"""
+        meter.calls["llm_prompt"] += 1
+        if images:
+            category = self.verdict["category"] if self.verdict else self.rng.choice(self.categories)
+            return f"CATEGORY_PRESENCE: present\nCATEGORY: {category}\nMAIN_OBJECTS:\n- OBJECT: simulated"
+        if prompt.startswith("You are a validator"):
+            return self.validator_answer
+        return self.judge(prompt.rsplit("\nINPUT:\n", 1)[-1])
+
+    def _verdict_for(self, image_analysis: str) -> dict:
+        if self.verdict:
+            return dict(self.verdict)
+        match = re.search(r"CATEGORY:\s*\"?(\w+)", image_analysis)
+        category = match.group(1) if match else "easter_eggs"
+        return {"category": category, "score": self.rng.randint(0, 1000), "reasoning": "simulated"}
+
+    def judge(self, jury_input: str) -> str:
+        """Single verdict for an image analysis, or a verdict array for a batch jury input"""
+        try:
+            items = json.loads(jury_input)
+        except json.JSONDecodeError:
+            items = None
+        if isinstance(items, list):
+            return json.dumps([dict(self._verdict_for(item["image_analysis"]), index=item["index"])
+                               for item in items])
+        return json.dumps(self._verdict_for(jury_input))
+
+
+sim = Simulation()
+
+
+def _consensus_round(fn):
+    """Run the leader's side of a consensus round; validators would repeat its web/LLM calls"""
+    meter.calls["consensus_round"] += 1
+    return fn()
+
+
+def _run_nondet(leader_fn, validator_fn):
+    """One consensus round: the leader's result, checked by a validator whose web/LLM calls aren't metered"""
+    meter.calls["consensus_round"] += 1
+    result = leader_fn()
+    calls = dict(meter.calls)
+    agreed = validator_fn(Return(result))
+    meter.calls.update(calls)
+    if not agreed:
+        raise ConsensusError("the validator rejected the leader's result")
+    return result
+
+
+class _Namespace:
+    def __init__(self, **attrs):
+        self.__dict__.update(attrs)
+
+
+gl = _Namespace(
+    Contract=Contract,
+    public=_Namespace(write=_public, view=_public),
+    message=_Namespace(sender_address=Address(bytes([1]) * 20)),
+    vm=_Namespace(UserError=UserError, Return=Return, run_nondet=_run_nondet),
+    nondet=_Namespace(
+        web=_Namespace(render=lambda url, mode="text": sim.render(url, mode)),
+        exec_prompt=lambda prompt, images=None: sim.exec_prompt(prompt, images),
+    ),
+    eq_principle=_Namespace(
+        strict_eq=lambda fn: _consensus_round(fn),
+        prompt_comparative=lambda fn, principle="": _consensus_round(fn),
+        prompt_non_comparative=lambda fn, task="", criteria="": sim.exec_prompt(
+            f"{task}\nINPUT:\n{_consensus_round(fn)}"),
+    ),
+)
+
+__all__ = ["gl", "TreeMap", "DynArray", "Address", "u32", "u64", "i64", "bigint", "allow_storage"]
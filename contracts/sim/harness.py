@@ -0,0 +1,125 @@
+"""Load the contract against the in-memory SDK and fill it with synthetic submissions."""
+
+import datetime
+import hashlib
+import importlib.util
+import json
+import os
+import random
+import sys
+
+SIM_DIR = os.path.dirname(os.path.abspath(__file__))
+CONTRACT_PATH = os.path.join(os.path.dirname(SIM_DIR), "proof_of_argentina.py")
+
+# The contract does `from genlayer import *`, resolve it to the stand-in
+if SIM_DIR not in sys.path:
+    sys.path.insert(0, SIM_DIR)
+
+import genlayer  # noqa: E402
+from genlayer import Address, gl, meter, profiler, sim  # noqa: E402
+
+
+def load_contract(path: str = CONTRACT_PATH):
+    """Import a contract file as a fresh module"""
+    spec = importlib.util.spec_from_file_location("proof_of_argentina", path)
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[spec.name] = module
+    spec.loader.exec_module(module)
+    return module
+
+
+# Frozen "now" of simulated transactions (Unix seconds); seeded records span the SEED_DAYS before it
+SIM_NOW = 1_763_000_000
+SEED_DAYS = 30
+
+# Names and locations for seeded records, so the search index has realistic postings
+SEED_NAMES = ["Bife de chorizo", "Asado del domingo", "Ojo de bife", "Mate amargo", "Medialunas de manteca",
+              "Empanadas salteñas", "Milanesa napolitana", "Choripán", "Camiseta de Boca", "Gaucho a caballo"]
+SEED_LOCATIONS = ["Buenos Aires", "Córdoba", "Mendoza", "Rosario", "Salta", "La Plata", "Mar del Plata",
+                  "San Miguel de Tucumán", "Bariloche", "Palermo, CABA"]
+
+
+def wallet(n: int) -> Address:
+    """Deterministic address for the n-th simulated wallet"""
+    return Address(n.to_bytes(20, "big"))
+
+
+def act_as(address: Address) -> None:
+    """Make the next calls come from this address"""
+    gl.message.sender_address = address
+
+
+def set_time(module, timestamp: int) -> None:
+    """Make the contract's datetime.now() return timestamp (Unix seconds)"""
+    class FrozenDatetime(datetime.datetime):
+        @classmethod
+        def now(cls, tz=None):
+            return datetime.datetime.fromtimestamp(timestamp, tz)
+
+    module.datetime = FrozenDatetime
+
+
+def deploy(module, owner: Address = None, image_cloud: str = "sim"):
+    """Deploy a fresh ImageAnalyzer at SIM_NOW, owned by wallet 0 unless told otherwise"""
+    set_time(module, SIM_NOW)
+    act_as(owner or wallet(0))
+    return module.ImageAnalyzer(image_cloud)
+
+
+def image_url(name: str, cloud: str = "sim") -> str:
+    """Content-addressed upload URL, as the upload route builds it, for a named test image"""
+    digest = hashlib.sha256(name.encode()).hexdigest()
+    return f"https://res.cloudinary.com/{cloud}/image/upload/c_limit,w_1024/v1/proof-of-stake/submissions/{digest}.jpg"
+
+
+def submit(contract, record_id: str, category: str = None, score: int = None, defense: str = "",
+           image: str = None, name: str = "Bife de chorizo", location: str = "Buenos Aires") -> None:
+    """Call analyze_image, pinning the verdict if category/score are given.
+
+    The image URL is derived from `image`, or from the id so every submission
+    is a new image unless told otherwise.
+    """
+    sim.verdict = None if category is None else {"category": category, "score": score, "reasoning": "simulated"}
+    url = image_url(image or record_id)
+    contract.analyze_image(record_id, url, url, url, defense, name, location)
+    sim.verdict = None
+
+
+def seed(module, contract, count: int, wallets: int = 0, rng: random.Random = None) -> list[str]:
+    """Store count scored submissions straight through the indexing path, unmetered.
+
+    Skips the LLM pipeline so millions of records load in minutes; the stored
+    state is the same analyze_image would build. Submissions are spread over
+    `wallets` wallets (count // 10 by default) and evenly over the SEED_DAYS
+    before SIM_NOW. Returns the ids in insert order.
+    """
+    rng = rng or random.Random(0)
+    wallets = wallets or max(1, count // 10)
+    categories = list(module.CATEGORIES)
+    addresses = [wallet(n + 1) for n in range(wallets)]
+    verdicts = {}
+    ids = []
+
+    enabled = meter.enabled
+    meter.enabled = False
+    try:
+        for n in range(count):
+            record_id = f"seed-{n}"
+            category = rng.choice(categories)
+            score = rng.randint(module.MIN_SCORE, module.MAX_SCORE)
+            key = (category, score)
+            if key not in verdicts:
+                verdicts[key] = json.dumps({"category": category, "score": score, "reasoning": "seeded"})
+            consensus_output = verdicts[key]
+            record = module.AnalysisRecord(record_id, consensus_output, rng.choice(addresses), "", "", "", "",
+                                           rng.choice(SEED_NAMES), rng.choice(SEED_LOCATIONS), score)
+            record.created_at = SIM_NOW - (count - n) * SEED_DAYS * 86400 // count
+            contract._store_record(record, category)
+            ids.append(record_id)
+    finally:
+        meter.enabled = enabled
+    return ids
+
+
+__all__ = ["genlayer", "gl", "meter", "profiler", "sim", "SIM_NOW", "load_contract", "wallet", "act_as",
+           "set_time", "deploy", "image_url", "submit", "seed"]
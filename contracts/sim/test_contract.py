@@ -0,0 +1,486 @@
+"""Regression checks for the contract, run against the stand-in SDK.
+
+    python -m pytest contracts/sim
+
+Every paged read is compared with a brute-force sort of analyses_by_id by
+(score desc, seq asc), so a change to the Fenwick offsets, keyset cursors or
+the migration's generation switch that reorders, drops or duplicates a row
+fails here.
+"""
+
+import json
+import random
+
+import pytest
+
+from genlayer import ConsensusError
+from harness import SIM_NOW, act_as, deploy, image_url, load_contract, meter, seed, set_time, sim, submit, wallet
+
+
+@pytest.fixture
+def module():
+    # A fresh module per test, so tests that change CATEGORIES don't leak
+    return load_contract()
+
+
+@pytest.fixture
+def contract(module):
+    contract = deploy(module)
+    seed(module, contract, 2000, 40, random.Random(1))
+    return contract
+
+
+def expected(contract, keep=lambda record: True) -> list[tuple[str, int]]:
+    """(id, score) of every scored record passing keep, in leaderboard order"""
+    rows = [(-record.score, record.seq, record_id, record.score)
+            for record_id, record in contract.analyses_by_id.items()
+            if record.status == "scored" and keep(record)]
+    return [(record_id, score) for _, _, record_id, score in sorted(rows)]
+
+
+def read_all(read, count: int = 10, ranked: bool = True) -> list[tuple[str, int]]:
+    """Follow next_cursor through a paged read, checking ranks are 1..n if the read is ranked"""
+    rows, cursor = [], ""
+    while True:
+        page = read(cursor, count)
+        for record in page["records"]:
+            assert not ranked or record["rank"] == len(rows) + 1
+            rows.append((record["id"], record["score"]))
+        cursor = page["next_cursor"]
+        if not page["has_more"]:
+            return rows
+
+
+def test_category_pages_match_sort(module, contract):
+    for category in module.CATEGORIES:
+        want = expected(contract, lambda record: record.category == category)
+        assert read_all(lambda cursor, count: contract.get_analysis_by_category(
+            category, 0, count, cursor=cursor)) == want
+
+        # Offset paging lands on the same rows as the cursor walk
+        for start in (0, 1, 9, len(want) // 2, len(want) - 1, len(want)):
+            page = contract.get_analysis_by_category(category, start, 10)
+            assert [(row["id"], row["score"]) for row in page["records"]] == want[start:start + 10]
+            assert page["total_count"] == len(want)
+
+        top = contract.get_analysis_by_category(category, 0, 10)["records"]
+        for row in top:
+            assert contract.get_analysis_by_id(row["id"])["rank"] == row["rank"]
+
+    slim = contract.get_analysis_by_category("steak", 0, 50, fields="slim")
+    assert [row[0] for row in slim["records"]] == [record_id for record_id, _ in
+                                                   expected(contract, lambda r: r.category == "steak")[:50]]
+
+
+def test_cursor_skips_rows_inserted_above_it(module, contract):
+    before = expected(contract, lambda record: record.category == "mate")
+    page = contract.get_analysis_by_category("mate", 0, 5)
+    seen = [row["id"] for row in page["records"]]
+
+    act_as(wallet(1))
+    for n in range(3):
+        submit(contract, f"late-{n}", "mate", module.MAX_SCORE)
+
+    cursor = page["next_cursor"]
+    while cursor:
+        page = contract.get_analysis_by_category("mate", 0, 10, cursor=cursor)
+        seen += [row["id"] for row in page["records"]]
+        cursor = page["next_cursor"] if page["has_more"] else ""
+    assert seen == [record_id for record_id, _ in before]
+
+
+def test_global_leaderboard_matches_sort(contract):
+    assert read_all(contract.get_global_leaderboard, 7) == expected(contract)
+
+
+def test_wallet_pages_match_sort(contract):
+    for n in (1, 2, 40):
+        address = wallet(n)
+        want = expected(contract, lambda record: record.caller_address == address)
+        assert want
+        assert read_all(lambda cursor, count: contract.get_analysis_by_wallet(
+            address.as_hex, 0, count, cursor=cursor)) == want
+        assert contract.get_analysis_by_wallet(address.as_hex, 3, 10)["records"][0]["id"] == want[3][0]
+
+
+@pytest.mark.parametrize("query, category", [
+    ("mendoza", ""),
+    ("Córdoba", "steak"),
+    ("bife chorizo", ""),
+    ("tucuman", "mate"),
+    ("zzz", ""),
+])
+def test_search_matches_brute_force(module, contract, monkeypatch, query, category):
+    tokens = contract._search_tokens(query, module.MAX_RECORD_TOKENS)
+
+    def matches(record):
+        record_tokens = contract._search_tokens(f"{record.name} {record.location}", module.MAX_RECORD_TOKENS)
+        return all(token in record_tokens for token in tokens) and category in ("", record.category)
+
+    want = expected(contract, matches)
+    # Search rows carry their category rank, not a position in the results
+    assert read_all(lambda cursor, count: contract.search_analyses(query, category, cursor, count),
+                    ranked=False) == want
+    for row in contract.search_analyses(query, category)["records"]:
+        assert row["rank"] == contract.get_analysis_by_id(row["id"])["rank"]
+
+    # A tiny scan budget only splits the results over more (possibly empty) pages
+    monkeypatch.setattr(module, "MAX_SEARCH_SCAN", 7)
+    assert read_all(lambda cursor, count: contract.search_analyses(query, category, cursor, count),
+                    ranked=False) == want
+
+
+def brute_stats(module, records) -> dict:
+    scores = [record.score for record in records]
+    histogram = [0] * module.HISTOGRAM_BUCKETS
+    for score in scores:
+        histogram[min((score - module.MIN_SCORE) // module.HISTOGRAM_BUCKET_WIDTH, module.HISTOGRAM_BUCKETS - 1)] += 1
+    return {"count": len(scores), "score_sum": sum(scores), "average_score": sum(scores) // len(scores) if scores else 0,
+            "max_score": max(scores, default=0), "histogram": histogram}
+
+
+def test_stats_match_brute_force(module, contract):
+    # A perfect score lands in the top bucket; a failed submission from a new wallet counts nowhere
+    act_as(wallet(1))
+    submit(contract, "perfect", "steak", module.MAX_SCORE)
+    act_as(wallet(99))
+    sim.unreachable.add(image_url("failed"))
+    try:
+        submit(contract, "failed")
+    finally:
+        sim.unreachable.clear()
+
+    scored = [record for record in contract.analyses_by_id.values() if record.status == "scored"]
+    stats = contract.get_stats(wallet(1).as_hex)
+    assert stats["total"] == brute_stats(module, scored)
+    for category in module.CATEGORIES:
+        assert stats["categories"][category] == brute_stats(
+            module, [record for record in scored if record.category == category])
+    assert stats["unique_wallets"] == len({record.caller_address for record in scored}) == 40
+    assert stats["wallet"] == brute_stats(module, [record for record in scored if record.caller_address == wallet(1)])
+
+    assert contract.get_stats(wallet(99).as_hex)["wallet"] == brute_stats(module, [])
+    assert contract.get_stats("not an address")["wallet"] == brute_stats(module, [])
+
+
+def read_window(contract, category: str, window: str, periods_ago: int = 0) -> list[tuple[str, int]]:
+    return read_all(lambda cursor, count: contract.get_leaderboard_window(
+        category, window, cursor, count, periods_ago=periods_ago))
+
+
+def test_window_leaderboards_match_sort(module, contract):
+    for window, retention in module.WINDOW_RETENTION.items():
+        for periods_ago in range(retention):
+            period = contract._window_period(window, SIM_NOW) - periods_ago
+            for category in module.CATEGORIES:
+                want = expected(contract, lambda record: record.category == category and
+                                contract._window_period(window, record.created_at) == period)
+                assert read_window(contract, category, window, periods_ago) == want
+
+            page = contract.get_leaderboard_window("steak", window, periods_ago=periods_ago)
+            assert (page["period_start"], page["period_end"]) == (contract._window_start(window, period),
+                                                                  contract._window_start(window, period + 1))
+
+        for periods_ago in (-1, retention):
+            with pytest.raises(module.gl.vm.UserError):
+                contract.get_leaderboard_window("steak", window, periods_ago=periods_ago)
+    with pytest.raises(module.gl.vm.UserError):
+        contract.get_leaderboard_window("steak", "month")
+
+
+def test_window_slots_roll_over(module):
+    day = module.SECONDS_PER_DAY
+    contract = deploy(module)
+    act_as(wallet(1))
+    submit(contract, "first", "steak", 500)
+    set_time(module, SIM_NOW + day)
+    submit(contract, "second", "steak", 400)
+    assert read_window(contract, "steak", "day") == [("second", 400)]
+    assert read_window(contract, "steak", "day", 1) == [("first", 500)]
+
+    # A week later the first day's slot is reused for the new day
+    set_time(module, SIM_NOW + 7 * day)
+    submit(contract, "third", "steak", 300)
+    assert read_window(contract, "steak", "day") == [("third", 300)]
+    assert read_window(contract, "steak", "day", 6) == [("second", 400)]
+
+    # Until something is submitted, a new day's slot still holds a week-old period
+    set_time(module, SIM_NOW + 8 * day)
+    assert read_window(contract, "steak", "day") == []
+    assert read_window(contract, "steak", "day", 1) == [("third", 300)]
+
+
+def test_late_scores_skip_rolled_out_windows(module):
+    day = module.SECONDS_PER_DAY
+    contract = deploy(module)
+    act_as(wallet(1))
+    sim.unreachable.add(image_url("late"))
+    try:
+        submit(contract, "late")
+    finally:
+        sim.unreachable.clear()
+
+    # Retried ten days later, the record keeps its created_at: it is past the
+    # day window's retention but still inside the week window's
+    set_time(module, SIM_NOW + 10 * day)
+    sim.verdict = {"category": "steak", "score": 700, "reasoning": "simulated"}
+    try:
+        contract.retry_analysis("late")
+    finally:
+        sim.verdict = None
+
+    for periods_ago in range(module.WINDOW_RETENTION["day"]):
+        assert read_window(contract, "steak", "day", periods_ago) == []
+    weeks_ago = contract._window_period("week", SIM_NOW + 10 * day) - contract._window_period("week", SIM_NOW)
+    assert read_window(contract, "steak", "week", weeks_ago) == [("late", 700)]
+    assert read_window(contract, "steak", "week") == []
+
+
+def test_change_feed_pages_in_order(module, contract):
+    events, seq = [], 0
+    while True:
+        page = contract.get_changes_since(seq, 7)
+        assert len(page["events"]) <= 7
+        events += page["events"]
+        seq = page["next_seq"]
+        if not page["has_more"]:
+            break
+    assert [event["seq"] for event in events] == list(range(1, 2001))
+    assert [event["id"] for event in events] == [f"seed-{n}" for n in range(2000)]
+    assert seq == page["latest_seq"] == 2000
+
+    # Out-of-range limits fall back to the cap
+    for limit in (0, -1, module.MAX_CHANGES_PAGE + 1):
+        assert len(contract.get_changes_since(0, limit)["events"]) == module.MAX_CHANGES_PAGE
+
+    # A client caught up at next_seq sees only the new events, including a retry
+    act_as(wallet(1))
+    sim.unreachable.add(image_url("retried"))
+    try:
+        submit(contract, "retried")
+    finally:
+        sim.unreachable.clear()
+    contract.retry_analysis("retried")
+    page = contract.get_changes_since(seq)
+    assert [(event["seq"], event["id"], event["status"]) for event in page["events"]] == [
+        (2001, "retried", "failed"), (2002, "retried", "scored")]
+    assert (page["next_seq"], page["has_more"]) == (2002, False)
+    assert contract.get_changes_since(5000)["events"] == []
+
+
+def run_migration(contract) -> dict:
+    act_as(wallet(0))
+    contract.start_migration()
+    while contract.get_migration_status()["phase"] != "idle":
+        contract.migrate(100)
+    return contract.get_migration_status()
+
+
+def test_migration_reindexes_every_record_once(module, contract):
+    # Failed submissions stay out of every generation until retried
+    act_as(wallet(3))
+    sim.unreachable.add(image_url("failed"))
+    submit(contract, "failed")
+    sim.unreachable.clear()
+
+    # Rule change: futbol is dropped, its records are re-derived into the catch-all
+    del module.CATEGORIES["futbol"]
+    status = run_migration(contract)
+    assert status["moved"] > 0 and status["rewritten"] == status["moved"]
+    assert list(contract.indexes.keys()) == [contract.active_generation]
+
+    # The rewritten records now have two scored events in the feed; a second
+    # migration must still index each of them once
+    status = run_migration(contract)
+    assert status["moved"] == 0
+    assert status["indexed"] == len(expected(contract))
+
+    for category in module.CATEGORIES:
+        want = expected(contract, lambda record: record.category == category)
+        assert read_all(lambda cursor, count: contract.get_analysis_by_category(
+            category, 0, count, cursor=cursor)) == want
+    assert read_all(contract.get_global_leaderboard) == expected(contract)
+    assert contract.get_stats()["total"]["count"] == len(expected(contract))
+    assert contract.get_analysis_by_id("failed")["rank"] == 0
+
+
+@pytest.mark.parametrize("verdict", [
+    {"category": ["steak"], "score": 900},
+    {"category": "steak", "score": 1e400},
+    {"category": {"steak": 1}, "score": "lots"},
+])
+def test_malformed_verdict_falls_back_to_catch_all(module, verdict):
+    contract = deploy(module)
+    act_as(wallet(1))
+    sim.verdict = verdict
+    url = image_url("odd")
+    try:
+        contract.analyze_image("odd", url, url, url)
+    finally:
+        sim.verdict = None
+
+    record = contract.get_analysis_by_id("odd")
+    assert (record["category"], record["score"]) == (module.CATCH_ALL_CATEGORY, 0)
+    assert json.loads(record["consensus_output"])
+
+
+def test_only_uploaded_images_hit_the_result_cache(module):
+    contract = deploy(module)
+    act_as(wallet(1))
+
+    def analyze(record_id, url, score):
+        sim.verdict = {"category": "steak", "score": score, "reasoning": "simulated"}
+        try:
+            contract.analyze_image(record_id, url, url, url)
+        finally:
+            sim.verdict = None
+        return contract.get_analysis_by_id(record_id)["score"]
+
+    # Caller-chosen URLs may serve different content, each one is judged
+    assert analyze("a", "https://example.com/photo?id=1", 990) == 990
+    meter.reset()
+    assert analyze("b", "https://example.com/photo?id=2", 10) == 10
+    assert meter.calls["llm_prompt"] > 0
+
+    # A content-addressed upload is the same photo every time
+    assert analyze("c", image_url("photo"), 990) == 990
+    meter.reset()
+    assert analyze("d", image_url("photo"), 10) == 990
+    assert meter.calls == {"web_render": 0, "llm_prompt": 0, "consensus_round": 0}
+
+    # The same path in someone else's cloud can hold anything
+    assert analyze("e", image_url("photo", "other"), 990) == 990
+    assert analyze("f", image_url("photo", "other"), 10) == 10
+    assert analyze("g", image_url("photo", "sim.evil"), 990) == 990
+    assert analyze("h", image_url("photo", "sim.evil"), 10) == 10
+
+
+@pytest.mark.parametrize("item", [
+    "not a dict",
+    {"id": "x"},
+    {"id": 7, "analysis_url": image_url("x")},
+    {"id": "x", "analysis_url": image_url("x"), "name": ["list"]},
+])
+def test_malformed_batch_items_are_rejected_up_front(module, item):
+    contract = deploy(module)
+    act_as(wallet(1))
+    meter.reset()
+    with pytest.raises(module.gl.vm.UserError):
+        contract.analyze_images([{"id": "ok", "analysis_url": image_url("ok")}, item])
+    assert meter.calls["consensus_round"] == 0
+    assert "ok" not in contract.analyses_by_id
+
+
+def test_unloadable_image_fails_without_a_jury_prompt(module):
+    contract = deploy(module)
+    act_as(wallet(1))
+    sim.unreachable.add(image_url("broken"))
+    try:
+        meter.reset()
+        submit(contract, "broken")
+    finally:
+        sim.unreachable.clear()
+
+    assert meter.calls == {"web_render": 1, "llm_prompt": 0, "consensus_round": 1}
+    record = contract.get_analysis_by_id("broken")
+    assert record["status"] == "failed"
+    assert json.loads(record["consensus_output"])["status"] == "failed"
+
+    # Validators that find the leader's verdict off the criteria reject the round
+    sim.validator_answer = "false"
+    try:
+        with pytest.raises(ConsensusError):
+            submit(contract, "rejected")
+    finally:
+        sim.validator_answer = "true"
+    assert "rejected" not in contract.analyses_by_id
+
+
+def test_retry_ranks_a_failed_record(module, contract):
+    act_as(wallet(1))
+    sim.unreachable.add(image_url("retried"))
+    try:
+        submit(contract, "retried")
+    finally:
+        sim.unreachable.clear()
+    count = contract.get_stats()["total"]["count"]
+
+    act_as(wallet(2))
+    with pytest.raises(module.gl.vm.UserError):
+        contract.retry_analysis("retried")
+
+    act_as(wallet(1))
+    sim.verdict = {"category": "steak", "score": module.MAX_SCORE, "reasoning": "simulated"}
+    try:
+        contract.retry_analysis("retried")
+    finally:
+        sim.verdict = None
+    with pytest.raises(module.gl.vm.UserError):
+        contract.retry_analysis("retried")
+
+    # Ranked like a fresh submission, behind earlier records with the same score
+    want = expected(contract, lambda record: record.category == "steak")
+    assert read_all(lambda cursor, count: contract.get_analysis_by_category(
+        "steak", 0, count, cursor=cursor)) == want
+    assert contract.get_analysis_by_id("retried")["rank"] == want.index(("retried", module.MAX_SCORE)) + 1
+    assert read_all(contract.get_global_leaderboard) == expected(contract)
+    assert read_all(lambda cursor, count: contract.get_analysis_by_wallet(
+        wallet(1).as_hex, 0, count, cursor=cursor)) == expected(contract, lambda record: record.caller_address == wallet(1))
+    assert contract.get_stats()["total"]["count"] == count + 1
+
+
+def test_submission_status_follows_the_record(module):
+    contract = deploy(module)
+    act_as(wallet(1))
+    assert contract.get_submission_status("photo") == {
+        "id": "photo", "found": False, "status": "pending", "score": 0, "category": ""}
+
+    sim.unreachable.add(image_url("photo"))
+    try:
+        submit(contract, "photo")
+    finally:
+        sim.unreachable.clear()
+    assert contract.get_submission_status("photo") == {
+        "id": "photo", "found": True, "status": "failed", "score": 0, "category": module.CATCH_ALL_CATEGORY}
+
+    sim.verdict = {"category": "steak", "score": 640, "reasoning": "simulated"}
+    try:
+        contract.retry_analysis("photo")
+    finally:
+        sim.verdict = None
+    assert contract.get_submission_status("photo") == {
+        "id": "photo", "found": True, "status": "scored", "score": 640, "category": "steak"}
+
+
+def test_failed_records_have_no_rank(module):
+    contract = deploy(module)
+    act_as(wallet(1))
+    # The first indexed record gets seq 0, like every record that was never indexed
+    submit(contract, "zero", module.CATCH_ALL_CATEGORY, 0)
+    sim.unreachable.add(image_url("failed"))
+    try:
+        submit(contract, "failed")
+    finally:
+        sim.unreachable.clear()
+
+    assert contract.get_analysis_by_id("zero")["rank"] == 1
+    assert contract.get_analysis_by_id("failed")["rank"] == 0
+    assert [row["rank"] for row in contract.get_analyses_by_ids(["zero", "failed"])["records"]] == [1, 0]
+
+
+def test_batch_items_the_jury_skips_fail_and_can_be_retried(module, monkeypatch):
+    contract = deploy(module)
+    act_as(wallet(1))
+    judge = sim.judge
+    monkeypatch.setattr(sim, "judge", lambda jury_input: json.dumps(json.loads(judge(jury_input))[:1]))
+    contract.analyze_images([{"id": name, "analysis_url": image_url(name)} for name in ("a", "b")])
+    monkeypatch.undo()
+
+    assert contract.get_analysis_by_id("a")["status"] == "scored"
+    skipped = contract.get_analysis_by_id("b")
+    assert (skipped["status"], skipped["rank"]) == ("failed", 0)
+    assert json.loads(skipped["consensus_output"])["status"] == "failed"
+
+    contract.retry_analysis("b")
+    retried = contract.get_analysis_by_id("b")
+    assert retried["status"] == "scored" and retried["rank"] > 0
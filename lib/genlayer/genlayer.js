@@ -16,6 +16,94 @@ function formatCategoryName(category) {
     .join(' ');
 }
 
+// Convert Maps to plain objects and BigInts to numbers, recursively, in a contract read result
+function convertMapsAndBigInts(obj) {
+  if (obj instanceof Map) {
+    return convertMapsAndBigInts(Object.fromEntries(obj));
+  } else if (Array.isArray(obj)) {
+    return obj.map(convertMapsAndBigInts);
+  } else if (obj && typeof obj === 'object') {
+    const converted = {};
+    for (const [key, value] of Object.entries(obj)) {
+      converted[key] = convertMapsAndBigInts(value);
+    }
+    return converted;
+  } else if (typeof obj === 'bigint') {
+    return Number(obj);
+  }
+  return obj;
+}
+
+// Expand compact rows returned by fields="slim" views into objects keyed by column name
+function expandSlimRows(records, columns) {
+  if (!Array.isArray(columns) || !Array.isArray(records)) return records;
+  return records.map((row) => Object.fromEntries(columns.map((column, i) => [column, row[i]])));
+}
+
+// ISO submission time from a record's created_at (Unix seconds); imported
+// records have 0 and fall back to now
+function toTimestamp(createdAt) {
+  return createdAt ? new Date(createdAt * 1000).toISOString() : new Date().toISOString();
+}
+
+// Transform a leaderboard/profile list record to match grid UI expectations
+function transformListRecord(record, category) {
+  let consensus = {};
+  try {
+    consensus = JSON.parse(record.consensus_output || '{}');
+  } catch (e) {
+    console.warn('Failed to parse consensus_output:', record.consensus_output);
+  }
+
+  return {
+    id: record.id, // Contract now always provides ID
+    image: record.leaderboard_url || record.analysis_url || record.original_url || record.url,
+    originalImage: record.original_url || record.image,
+    name: record.name || `${formatCategoryName(consensus.category || category)} Entry`,
+    location: record.location || 'Location not provided',
+    votes: consensus.score || record.score || 0,
+    submittedBy: record.caller_address?.slice(0, 6) + '...' + record.caller_address?.slice(-4) || 'Unknown',
+    timestamp: toTimestamp(record.created_at),
+    description: consensus.reasoning || 'No reasoning provided',
+    rank: record.rank,
+    score: record.score,
+    // Keep original data for reference
+    _original: record,
+    _consensus: consensus
+  };
+}
+
+// Transform a single contract record (with category) to the submission detail UI format
+function transformSubmission(processed) {
+  let consensus = {};
+  try {
+    consensus = JSON.parse(processed.consensus_output || '{}');
+  } catch (e) {
+    console.warn('Failed to parse consensus_output:', processed.consensus_output);
+  }
+
+  // Use category from contract response (preferred) or consensus fallback
+  const category = processed.category || consensus.category || 'steak';
+
+  return {
+    id: processed.id,
+    category: category,
+    image: processed.leaderboard_url || processed.analysis_url || processed.original_url,
+    originalImage: processed.original_url || processed.image,
+    name: processed.name || `${formatCategoryName(category)} Entry`,
+    location: processed.location || 'Location not provided',
+    votes: consensus.score || processed.score || 0,
+    submittedBy: processed.caller_address?.slice(0, 6) + '...' + processed.caller_address?.slice(-4) || 'Unknown',
+    timestamp: toTimestamp(processed.created_at),
+    description: consensus.reasoning || 'No reasoning provided',
+    rank: processed.rank,
+    score: processed.score,
+    // Keep original data for reference
+    _original: processed,
+    _consensus: consensus
+  };
+}
+
 let readClient = null;
 const writeClients = new Map();
 
@@ -140,68 +228,171 @@ export async function analyzeImage(id, originalUrl, leaderboardUrl, analysisUrl,
   }
 }
 
+// Submit several images in one transaction (max 8), e.g. from an event booth.
+// submissions: [{ id, originalUrl, leaderboardUrl, analysisUrl, defense, name, location }]
+export async function analyzeImages(submissions, userAddress, waitForReceipt = true) {
+  if (!userAddress) {
+    throw new Error('Wallet address required for image analysis')
+  }
+
+  if (!Array.isArray(submissions) || submissions.length === 0) {
+    throw new Error('At least one submission is required')
+  }
+
+  const client = getWriteClient(userAddress)
+
+  const batch = submissions.map((submission) => ({
+    id: submission.id,
+    original_url: submission.originalUrl,
+    leaderboard_url: submission.leaderboardUrl,
+    analysis_url: submission.analysisUrl,
+    defense: submission.defense || '',
+    name: submission.name || '',
+    location: submission.location || '',
+  }))
+
+  const hash = await client.writeContract({
+    address: CONTRACT_ADDRESS,
+    functionName: 'analyze_images',
+    args: [batch],
+    value: 0n,
+  })
+
+
+  if (!waitForReceipt) {
+    return { hash };
+  }
+
+  try {
+    const receipt = await client.waitForTransactionReceipt({
+      hash,
+      status: "ACCEPTED",
+      retries: 24,
+      interval: 5000,
+    });
+
+    return { hash, receipt };
+  } catch (receiptError) {
+    console.error('Failed to get transaction receipt:', receiptError);
+    throw new Error(`Transaction submitted (${hash}) but confirmation timed out. Check status later.`);
+  }
+}
+
+// Re-run the analysis of a submission whose image failed to load or analyze
+// (record status 'failed'). Only the submitter or the contract owner can retry.
+export async function retryAnalysis(id, userAddress, waitForReceipt = true) {
+  if (!userAddress) {
+    throw new Error('Wallet address required to retry an analysis')
+  }
+
+  const client = getWriteClient(userAddress)
+
+  const hash = await client.writeContract({
+    address: CONTRACT_ADDRESS,
+    functionName: 'retry_analysis',
+    args: [id],
+    value: 0n,
+  })
+
+
+  if (!waitForReceipt) {
+    return { hash };
+  }
+
+  try {
+    const receipt = await client.waitForTransactionReceipt({
+      hash,
+      status: "ACCEPTED",
+      retries: 24,
+      interval: 5000,
+    });
+
+    return { hash, receipt };
+  } catch (receiptError) {
+    console.error('Failed to get transaction receipt:', receiptError);
+    throw new Error(`Transaction submitted (${hash}) but confirmation timed out. Check status later.`);
+  }
+}
+
+// fields: 'full' (default) or 'slim' for grid rows without consensus_output/defense
+// (slim pages can be up to 50 records)
+// cursor: next_cursor from the previous page; when set it replaces startIndex and
+// keeps "Load more" free of duplicates/gaps while new submissions arrive
 export async function getAnalysisByCategory(
   category,
   startIndex = 0,
-  count = 10
+  count = 10,
+  fields = 'full',
+  cursor = ''
 ) {
   const client = getReadClient();
 
   const result = await client.readContract({
     address: CONTRACT_ADDRESS,
     functionName: "get_analysis_by_category",
-    args: [category, startIndex, count],
+    args: [category, startIndex, count, fields, cursor],
   });
 
+  if (result instanceof Map) {
+    const processed = convertMapsAndBigInts(result);
+    processed.records = expandSlimRows(processed.records, processed.columns);
 
-  // Convert Map to regular object and handle BigInt values recursively
-  function convertMapsAndBigInts(obj) {
-    if (obj instanceof Map) {
-      return convertMapsAndBigInts(Object.fromEntries(obj));
-    } else if (Array.isArray(obj)) {
-      return obj.map(convertMapsAndBigInts);
-    } else if (obj && typeof obj === 'object') {
-      const converted = {};
-      for (const [key, value] of Object.entries(obj)) {
-        converted[key] = convertMapsAndBigInts(value);
-      }
-      return converted;
-    } else if (typeof obj === 'bigint') {
-      return Number(obj);
+    // Transform GenLayer records to match UI expectations
+    if (processed.records && Array.isArray(processed.records)) {
+      processed.records = processed.records.map((record) => transformListRecord(record, category));
+    }
+
+    return processed;
+  }
+
+  return result;
+}
+
+// Best submissions of one category this day or week (window: 'day' | 'week').
+// periodsAgo reaches back up to 6 days / 3 weeks; paging works like the
+// category cursor, and the result also carries period_start/period_end (Unix seconds).
+export async function getLeaderboardWindow(category, window = 'week', cursor = '', count = 10, fields = 'full', periodsAgo = 0) {
+  const client = getReadClient();
+
+  const result = await client.readContract({
+    address: CONTRACT_ADDRESS,
+    functionName: "get_leaderboard_window",
+    args: [category, window, cursor, count, fields, periodsAgo],
+  });
+
+  if (result instanceof Map) {
+    const processed = convertMapsAndBigInts(result);
+    processed.records = expandSlimRows(processed.records, processed.columns);
+
+    // Transform GenLayer records to match UI expectations
+    if (processed.records && Array.isArray(processed.records)) {
+      processed.records = processed.records.map((record) => transformListRecord(record, category));
     }
-    return obj;
+
+    return processed;
   }
 
+  return result;
+}
+
+// Overall ranking across every category. Pass the returned next_cursor
+// back in to get the following page ('' starts from the top).
+export async function getGlobalLeaderboard(cursor = '', count = 10, fields = 'full') {
+  const client = getReadClient();
+
+  const result = await client.readContract({
+    address: CONTRACT_ADDRESS,
+    functionName: "get_global_leaderboard",
+    args: [cursor, count, fields],
+  });
+
   if (result instanceof Map) {
     const processed = convertMapsAndBigInts(result);
+    processed.records = expandSlimRows(processed.records, processed.columns);
 
     // Transform GenLayer records to match UI expectations
     if (processed.records && Array.isArray(processed.records)) {
-      processed.records = processed.records.map((record) => {
-        let consensus = {};
-        try {
-          consensus = JSON.parse(record.consensus_output || '{}');
-        } catch (e) {
-          console.warn('Failed to parse consensus_output:', record.consensus_output);
-        }
-
-        return {
-          id: record.id, // Contract now always provides ID
-          image: record.leaderboard_url || record.analysis_url || record.original_url || record.url,
-          originalImage: record.original_url || record.image,
-          name: record.name || `${formatCategoryName(consensus.category)} Entry`,
-          location: record.location || 'Location not provided',
-          votes: consensus.score || record.score || 0,
-          submittedBy: record.caller_address?.slice(0, 6) + '...' + record.caller_address?.slice(-4) || 'Unknown',
-          timestamp: new Date().toISOString(),
-          description: consensus.reasoning || 'No reasoning provided',
-          rank: record.rank,
-          score: record.score,
-          // Keep original data for reference
-          _original: record,
-          _consensus: consensus
-        };
-      });
+      processed.records = processed.records.map((record) => transformListRecord(record, record.category));
     }
 
     return processed;
@@ -210,34 +401,39 @@ export async function getAnalysisByCategory(
   return result;
 }
 
-export async function getAnalysisById(id) {
+export async function searchAnalyses(query, category = '', cursor = '', count = 10, fields = 'full') {
   const client = getReadClient();
 
   const result = await client.readContract({
     address: CONTRACT_ADDRESS,
-    functionName: "get_analysis_by_id",
-    args: [id],
+    functionName: "search_analyses",
+    args: [query, category, cursor, count, fields],
   });
 
+  if (result instanceof Map) {
+    const processed = convertMapsAndBigInts(result);
+    processed.records = expandSlimRows(processed.records, processed.columns);
 
-  // Convert Map to regular object and handle BigInt values
-  function convertMapsAndBigInts(obj) {
-    if (obj instanceof Map) {
-      return convertMapsAndBigInts(Object.fromEntries(obj));
-    } else if (Array.isArray(obj)) {
-      return obj.map(convertMapsAndBigInts);
-    } else if (obj && typeof obj === 'object') {
-      const converted = {};
-      for (const [key, value] of Object.entries(obj)) {
-        converted[key] = convertMapsAndBigInts(value);
-      }
-      return converted;
-    } else if (typeof obj === 'bigint') {
-      return Number(obj);
+    // Transform GenLayer records to match UI expectations
+    if (processed.records && Array.isArray(processed.records)) {
+      processed.records = processed.records.map((record) => transformListRecord(record, record.category));
     }
-    return obj;
+
+    return processed;
   }
 
+  return result;
+}
+
+export async function getAnalysisById(id) {
+  const client = getReadClient();
+
+  const result = await client.readContract({
+    address: CONTRACT_ADDRESS,
+    functionName: "get_analysis_by_id",
+    args: [id],
+  });
+
   if (result instanceof Map) {
     const processed = convertMapsAndBigInts(result);
 
@@ -247,41 +443,78 @@ export async function getAnalysisById(id) {
       return null;
     }
 
-    // Transform single record to UI format
-    let consensus = {};
-    try {
-      consensus = JSON.parse(processed.consensus_output || '{}');
-    } catch (e) {
-      console.warn('Failed to parse consensus_output:', processed.consensus_output);
-    }
+    return transformSubmission(processed);
+  }
 
-    // Use category from contract response (preferred) or consensus fallback
-    const category = processed.category || consensus.category || 'steak';
-
-    const transformed = {
-      id: processed.id,
-      category: category,
-      image: processed.leaderboard_url || processed.analysis_url || processed.original_url,
-      originalImage: processed.original_url || processed.image,
-      name: processed.name || `${formatCategoryName(category)} Entry`,
-      location: processed.location || 'Location not provided',
-      votes: consensus.score || processed.score || 0,
-      submittedBy: processed.caller_address?.slice(0, 6) + '...' + processed.caller_address?.slice(-4) || 'Unknown',
-      timestamp: new Date().toISOString(),
-      description: consensus.reasoning || 'No reasoning provided',
-      rank: processed.rank,
-      score: processed.score,
-      // Keep original data for reference
-      _original: processed,
-      _consensus: consensus
-    };
+  return result;
+}
+
+// Fetch many submissions in one contract call. Returns an array in the same
+// order as ids, with null for ids the contract doesn't know (yet).
+// At most 10 ids per call for 'full', 50 for 'slim'.
+export async function getAnalysesByIds(ids, fields = 'full') {
+  if (!Array.isArray(ids) || ids.length === 0) {
+    return [];
+  }
+
+  const client = getReadClient();
+
+  const result = await client.readContract({
+    address: CONTRACT_ADDRESS,
+    functionName: "get_analyses_by_ids",
+    args: [ids, fields],
+  });
+
+  if (result instanceof Map) {
+    const processed = convertMapsAndBigInts(result);
+    const records = expandSlimRows(processed.records || [], processed.columns);
 
-    return transformed;
+    return records.map((record) => (record ? transformSubmission(record) : null));
   }
 
   return result;
 }
 
+// Aggregate numbers (counts, averages, max, score histograms, unique wallets).
+// Pass a wallet address to also get that wallet's totals.
+export async function getStats(walletAddress = '') {
+  const client = getReadClient();
+
+  const result = await client.readContract({
+    address: CONTRACT_ADDRESS,
+    functionName: "get_stats",
+    args: [walletAddress],
+  });
+
+  return convertMapsAndBigInts(result);
+}
+
+// Lightweight status poll for a submission: { id, found, status, score, category }.
+// status is 'pending' until the record exists, then 'scored' or 'failed'.
+export async function getSubmissionStatus(id) {
+  const client = getReadClient();
+
+  const result = await client.readContract({
+    address: CONTRACT_ADDRESS,
+    functionName: "get_submission_status",
+    args: [id],
+  });
+
+  return convertMapsAndBigInts(result);
+}
+
+export async function getChangesSince(seq = 0, limit = 100) {
+  const client = getReadClient();
+
+  const result = await client.readContract({
+    address: CONTRACT_ADDRESS,
+    functionName: "get_changes_since",
+    args: [seq, limit],
+  });
+
+  return convertMapsAndBigInts(result);
+}
+
 export async function waitForTransactionConfirmation(hash) {
   const client = getReadClient();
 
@@ -296,7 +529,6 @@ export async function waitForTransactionConfirmation(hash) {
       interval: 3000, // Check every 3 seconds
     });
 
-
     // If we got here, the transaction reached ACCEPTED status
     return {
       success: true,
@@ -308,7 +540,7 @@ export async function waitForTransactionConfirmation(hash) {
   }
 }
 
-export async function getAnalysesByWallet(userAddress, startIndex = 0, count = 10) {
+export async function getAnalysesByWallet(userAddress, startIndex = 0, count = 10, fields = 'full', cursor = '') {
   // Simple validation - just check if we have a valid string
   if (!userAddress || typeof userAddress !== 'string') {
     throw new Error('Invalid wallet address provided');
@@ -328,58 +560,16 @@ export async function getAnalysesByWallet(userAddress, startIndex = 0, count = 1
   const result = await client.readContract({
     address: CONTRACT_ADDRESS,
     functionName: "get_analysis_by_wallet",
-    args: [userAddress, startIndex, count],
+    args: [userAddress, startIndex, count, fields, cursor],
   });
 
-
-  // Convert Map to regular object and handle BigInt values recursively
-  function convertMapsAndBigInts(obj) {
-    if (obj instanceof Map) {
-      return convertMapsAndBigInts(Object.fromEntries(obj));
-    } else if (Array.isArray(obj)) {
-      return obj.map(convertMapsAndBigInts);
-    } else if (obj && typeof obj === 'object') {
-      const converted = {};
-      for (const [key, value] of Object.entries(obj)) {
-        converted[key] = convertMapsAndBigInts(value);
-      }
-      return converted;
-    } else if (typeof obj === 'bigint') {
-      return Number(obj);
-    }
-    return obj;
-  }
-
   if (result instanceof Map) {
     const processed = convertMapsAndBigInts(result);
+    processed.records = expandSlimRows(processed.records, processed.columns);
 
     // Transform GenLayer records to match UI expectations
     if (processed.records && Array.isArray(processed.records)) {
-      processed.records = processed.records.map((record) => {
-        let consensus = {};
-        try {
-          consensus = JSON.parse(record.consensus_output || '{}');
-        } catch (e) {
-          console.warn('Failed to parse consensus_output:', record.consensus_output);
-        }
-
-        return {
-          id: record.id, // Contract now always provides ID
-          image: record.leaderboard_url || record.analysis_url || record.original_url || record.url,
-          originalImage: record.original_url || record.image,
-          name: record.name || `${formatCategoryName(consensus.category)} Entry`,
-          location: record.location || 'Location not provided',
-          votes: consensus.score || record.score || 0,
-          submittedBy: record.caller_address?.slice(0, 6) + '...' + record.caller_address?.slice(-4) || 'Unknown',
-          timestamp: new Date().toISOString(),
-          description: consensus.reasoning || 'No reasoning provided',
-          rank: record.rank,
-          score: record.score,
-          // Keep original data for reference
-          _original: record,
-          _consensus: consensus
-        };
-      });
+      processed.records = processed.records.map((record) => transformListRecord(record, record.category));
     }
 
     return processed;
@@ -3,9 +3,10 @@
 import { useState, useEffect, useCallback } from 'react'
 import { getAnalysisByCategory } from '../genlayer/genlayer.js'
 
-export function useCategoryData(category, pageSize = 10) {
+export function useCategoryData(category, pageSize = 30) {
   const [records, setRecords] = useState([])
-  const [startIndex, setStartIndex] = useState(0)
+  // Keyset cursor from the last loaded page ('' = first page)
+  const [cursor, setCursor] = useState('')
   const [hasMore, setHasMore] = useState(true)
   const [isLoading, setIsLoading] = useState(false)
   const [totalCount, setTotalCount] = useState(0)
@@ -15,8 +16,8 @@ export function useCategoryData(category, pageSize = 10) {
 
     setIsLoading(true)
     try {
-      const currentStartIndex = isLoadMore ? startIndex : 0
-      const result = await getAnalysisByCategory(category, currentStartIndex, pageSize)
+      const currentCursor = isLoadMore ? cursor : ''
+      const result = await getAnalysisByCategory(category, 0, pageSize, 'slim', currentCursor)
 
 
       if (isLoadMore) {
@@ -25,7 +26,7 @@ export function useCategoryData(category, pageSize = 10) {
         setRecords(result.records || [])
       }
 
-      setStartIndex(currentStartIndex + (result.returned_count || 0))
+      setCursor(result.next_cursor || '')
       setHasMore(result.has_more || false)
       setTotalCount(result.total_count || 0)
     } catch (error) {
@@ -33,14 +34,14 @@ export function useCategoryData(category, pageSize = 10) {
     } finally {
       setIsLoading(false)
     }
-  }, [category, startIndex, pageSize, isLoading])
+  }, [category, cursor, pageSize, isLoading])
 
   const loadMore = useCallback(() => {
     loadData(true)
   }, [loadData])
 
   const refresh = useCallback(() => {
-    setStartIndex(0)
+    setCursor('')
     loadData(false)
   }, [loadData])
 
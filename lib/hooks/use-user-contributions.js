@@ -3,9 +3,10 @@
 import { useState, useEffect, useCallback } from 'react'
 import { getAnalysesByWallet } from '../genlayer/genlayer.js'
 
-export function useUserContributions(userAddress, pageSize = 10) {
+export function useUserContributions(userAddress, pageSize = 30) {
   const [records, setRecords] = useState([])
-  const [startIndex, setStartIndex] = useState(0)
+  // Keyset cursor from the last loaded page ('' = first page)
+  const [cursor, setCursor] = useState('')
   const [hasMore, setHasMore] = useState(true)
   const [isLoading, setIsLoading] = useState(false)
   const [totalCount, setTotalCount] = useState(0)
@@ -19,14 +20,14 @@ export function useUserContributions(userAddress, pageSize = 10) {
       setRecords([])
       setHasMore(false)
       setTotalCount(0)
-      setStartIndex(0)
+      setCursor('')
       return
     }
 
     setIsLoading(true)
     try {
-      const currentStartIndex = isLoadMore ? startIndex : 0
-      const result = await getAnalysesByWallet(userAddress, currentStartIndex, pageSize)
+      const currentCursor = isLoadMore ? cursor : ''
+      const result = await getAnalysesByWallet(userAddress, 0, pageSize, 'slim', currentCursor)
 
       if (isLoadMore) {
         setRecords(prev => [...prev, ...(result.records || [])])
@@ -34,7 +35,7 @@ export function useUserContributions(userAddress, pageSize = 10) {
         setRecords(result.records || [])
       }
 
-      setStartIndex(currentStartIndex + (result.returned_count || 0))
+      setCursor(result.next_cursor || '')
       setHasMore(result.has_more || false)
       setTotalCount(result.total_count || 0)
     } catch (error) {
@@ -46,14 +47,14 @@ export function useUserContributions(userAddress, pageSize = 10) {
     } finally {
       setIsLoading(false)
     }
-  }, [userAddress, startIndex, pageSize, isLoading])
+  }, [userAddress, cursor, pageSize, isLoading])
 
   const loadMore = useCallback(() => {
     loadData(true)
   }, [loadData])
 
   const refresh = useCallback(() => {
-    setStartIndex(0)
+    setCursor('')
     loadData(false)
   }, [loadData])
 
@@ -65,7 +66,7 @@ export function useUserContributions(userAddress, pageSize = 10) {
       setRecords([])
       setHasMore(false)
       setTotalCount(0)
-      setStartIndex(0)
+      setCursor('')
     }
   }, [userAddress, refresh])
 